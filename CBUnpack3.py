@@ -1,6 +1,5 @@
-from os import (path, listdir, remove,
+from os import (path, remove,
                 makedirs, cpu_count)
-import shutil
 import subprocess
 import sys
 from loguru import logger
@@ -8,6 +7,8 @@ from convert import convert_to_png, convert_spine
 from config_manager import ConfigManager
 from check import check_tool_availability
 from concurrent.futures import ThreadPoolExecutor
+from pak_vfs import vfs
+from scheduler import scheduler, work_log
 
 # 运行根目录
 if '__compiled__' in globals():
@@ -23,7 +24,7 @@ UseCNName = cfg.get("UseCNName")
 
 # 工具函数：检查路径
 def check_dir(_path: str, desc: str) -> bool:
-    if not path.isdir(_path):
+    if not vfs.isdir(_path):
         logger.warning(f"{desc} 不存在，跳过：{_path}")
         return False
     return True
@@ -36,25 +37,27 @@ def activity_ui(rootpath, out_path):
         return
     makedirs(_p2, exist_ok=True)
 
-    try:
-        for entry in listdir(_p1):
-            if entry == "Login_Plots":
-                continue
-            pdp1 = path.join(_p1, entry)
-            if not path.isdir(pdp1):
-                continue
-            pdp2 = path.join(_p2, entry)
-            polt_asset = path.join(pdp1, "PoltAsset")
-            if path.isdir(polt_asset):
-                bg = path.join(polt_asset, "Bg")
-                if path.isdir(bg):
-                    convert_to_png(bg, path.join(pdp2, "Bg"))
-                convert_spine(path.join(polt_asset, "Spine"), pdp2)
-            else:
-                convert_to_png(pdp1, pdp2)
-                convert_spine(pdp1, pdp2)
-    except Exception as e:
-        logger.error(f"[activity_ui] 出现异常: {e}")
+    # 同一轮中 convert_to_png 与 convert_spine 对同一目录只转换一次
+    with work_log.run():
+        try:
+            for entry in vfs.listdir(_p1):
+                if entry == "Login_Plots":
+                    continue
+                pdp1 = path.join(_p1, entry)
+                if not vfs.isdir(pdp1):
+                    continue
+                pdp2 = path.join(_p2, entry)
+                polt_asset = path.join(pdp1, "PoltAsset")
+                if vfs.isdir(polt_asset):
+                    bg = path.join(polt_asset, "Bg")
+                    if vfs.isdir(bg):
+                        convert_to_png(bg, path.join(pdp2, "Bg"))
+                    convert_spine(path.join(polt_asset, "Spine"), pdp2)
+                else:
+                    convert_to_png(pdp1, pdp2)
+                    convert_spine(pdp1, pdp2)
+        except Exception as e:
+            logger.error(f"[activity_ui] 出现异常: {e}")
 
 
 def login_ui(rootpath, out_path):
@@ -63,11 +66,12 @@ def login_ui(rootpath, out_path):
     if not check_dir(_p1, "开始页面动画资源"):
         return
     makedirs(_p2, exist_ok=True)
-    convert_to_png(_p1, _p2)
-    _p1 = path.join(rootpath, r"Game\Content\Plot\CgPlot\Login_Plots\PoltAsset\Spine")
-    _p2 = path.join(out_path, r"Login_Plots")
-    convert_to_png(_p1, _p2)
-    convert_spine(_p1, _p2)
+    with work_log.run():
+        convert_to_png(_p1, _p2)
+        _p1 = path.join(rootpath, r"Game\Content\Plot\CgPlot\Login_Plots\PoltAsset\Spine")
+        _p2 = path.join(out_path, r"Login_Plots")
+        convert_to_png(_p1, _p2)
+        convert_spine(_p1, _p2)
 
 
 def chara(rootpath, out_path):
@@ -118,14 +122,16 @@ def convert_audio_single(oldn, newn, path_out):
 
     try:
         logger.info(f"[→] 正在解码 {newn}.wem 为 WAV...")
-        subprocess.run([vgm_path, "-o", wav_path, wem_path], check=True, stdout=subprocess.DEVNULL)
+        with scheduler.slot("tool"):
+            subprocess.run([vgm_path, "-o", wav_path, wem_path], check=True, stdout=subprocess.DEVNULL)
         logger.info(f"[✓] 已生成临时 WAV: {wav_path}")
 
         logger.info(f"[→] 正在转换 WAV 为 FLAC: {flac_path}")
-        subprocess.run([ffm_path, "-y", "-i", wav_path, "-c:a", "flac", flac_path],
-                       check=True,
-                       stdout=subprocess.DEVNULL,
-                       stderr=subprocess.DEVNULL)
+        with scheduler.slot("tool"):
+            subprocess.run([ffm_path, "-y", "-i", wav_path, "-c:a", "flac", flac_path],
+                           check=True,
+                           stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL)
         logger.success(f"[✔] 成功转换 {newn}.wem → {newn}.flac")
 
     except subprocess.CalledProcessError as e:
@@ -140,6 +146,18 @@ def convert_audio_single(oldn, newn, path_out):
                 logger.debug(f"[清理] 删除临时文件: {tmp}")
 
 
+def copy_wem(src, dst):
+    """把一个 .wem 从 pak / 解包目录复制到输出目录，占一个 io 槽"""
+    with scheduler.slot("io"):
+        vfs.copy(src, dst)
+
+
+def wem_size(oldn, newn, path_out):
+    """convert_audio_single 任务的输入大小（已复制到输出目录的 .wem），用于长音轨优先排序"""
+    wem_path = path.join(path_out, f"{oldn}.wem")
+    return path.getsize(wem_path) if path.exists(wem_path) else 0
+
+
 def bgm(rootpath, out_path):
     _p1 = path.join(rootpath, r"Game\Content\Wwise\Windows")
     _p2 = path.join(out_path, "BGM")
@@ -147,25 +165,26 @@ def bgm(rootpath, out_path):
         return
     makedirs(_p2, exist_ok=True)
 
-    wem_files = [f for f in listdir(_p1) if f.endswith(".wem")]
+    wem_files = [f for f in vfs.listdir(_p1) if f.endswith(".wem")]
     if not wem_files:
         logger.warning("未找到任何 WEM 文件，跳过音频处理")
         return
 
-    for wem in wem_files:
-        shutil.copy(path.join(_p1, wem), path.join(_p2, wem))
+    # 从 pak / 解包目录复制到输出目录，占 io 槽，按文件大小从大到小提交
+    scheduler.map(copy_wem, [(path.join(_p1, wem), path.join(_p2, wem)) for wem in wem_files],
+                  size=lambda src, dst: vfs.getsize(src))
 
     wem_names = [path.splitext(f)[0] for f in wem_files]
     logger.info(f"共提取 {len(wem_names)} 个音频")
 
     # 读取 BGM.txt
     txt_path = path.join(_p1, "BGM.txt")
-    if not path.isfile(txt_path):
+    if not vfs.isfile(txt_path):
         logger.warning("未找到 BGM.txt，跳过生成 sheet.txt")
         return
     # print(_list)
     _path = path.join(rootpath, r"Game\Content\Wwise\Windows\BGM.txt")
-    _m3u = open(_path, 'r+', encoding='utf-8')
+    _m3u = vfs.open(_path, 'r', encoding='utf-8')
     _sheet = []
     for _line in _m3u:
         for i in wem_names:
@@ -187,14 +206,14 @@ def bgm(rootpath, out_path):
     # print(_sheet)
 
     _path = path.join(rootpath, r"Game\Content\Settings\language\riki.txt")
-    _txt = open(_path, 'r+', encoding='utf-8')
+    _txt = vfs.open(_path, 'r', encoding='utf-8')
     _dict = {}
     for _line in _txt:
         if "BGM_DLC" in _line and "_name" in _line:
             sl = _line.split("\t")
             _dict[sl[0]] = sl[1]
     _path = path.join(rootpath, r"Game\Content\Settings\riki\Riki.txt")
-    _txt = open(_path, 'r+', encoding='utf-8')
+    _txt = vfs.open(_path, 'r', encoding='utf-8')
     _lines1 = []
     for _line in _txt:
         if "BGM|" in _line:
@@ -290,21 +309,14 @@ def bgm(rootpath, out_path):
     # print("nnli:", nnli)
     # return
     # 解码 wem → flac
-    max_workers = min(32, (cpu_count() or 1) * 4)
     print(wem_names)
     print(nnli)
     print(_sheet)
     print(cnnali)
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # 提交所有任务到线程池，并传入索引 i
-        futures = [
-            executor.submit(convert_audio_single, oldn, newn, _p2)
-            for oldn, newn in zip(wem_names, nnli)
-        ]
-
-        # 可选：等待所有任务完成（with 语句会自动等待）
-        for future in futures:
-            future.result()  # 检查是否有异常
+    # 长音轨先开始
+    scheduler.map(convert_audio_single, [(oldn, newn, _p2) for oldn, newn in zip(wem_names, nnli)],
+                  key=lambda oldn, newn, out: f"audio:{oldn}",
+                  size=wem_size)
 
 
 def CBUNpakMain():
@@ -341,10 +353,11 @@ def CBUNpakMain():
         except Exception as e:
             logger.error(f"{name} 处理失败: {e}")
     
-    # 使用线程池并行执行任务
+    # 这里的线程只负责编排各阶段，实际工作都提交到全局调度器，并发由 tool / cpu / io 槽位决定
     max_workers = min(4, (cpu_count() or 1))  # 限制并发数避免资源争用
     
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    # 整轮共用一份已完成记录，各阶段之间重复的目录也只转换一次
+    with work_log.run(), ThreadPoolExecutor(max_workers=max_workers) as executor:
         futures = [executor.submit(run_task, task) for task in tasks]
         for future in futures:
             future.result()
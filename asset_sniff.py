@@ -0,0 +1,63 @@
+"""
+资源类型识别
+只读 .uasset 头部（名称表 + 导入 / 导出表）取出主导出对象的类名（Texture2D、SpineAtlasAsset、
+SpineSkeletonDataAsset、SoundWave ...），在启动 umodel 等外部工具之前把每个资源分给能处理它的流程；
+结果按文件身份缓存，同一次运行中重复询问不会再次读取
+"""
+from functools import lru_cache
+from os import path, stat
+from loguru import logger
+from pak_vfs import vfs
+from uasset_reader import UAssetError, read_package
+
+TEXTURE_CLASSES = frozenset({"Texture2D"})
+SPINE_CLASSES = frozenset({"SpineAtlasAsset", "SpineSkeletonDataAsset"})
+
+
+def _identity(uasset: str):
+    """pak 中的虚拟文件取索引 sha1，真实文件取 (大小, mtime)；文件不存在时返回 None"""
+    entry_hash = vfs.entry_hash(uasset)
+    if entry_hash is not None:
+        return entry_hash
+    try:
+        st = stat(uasset)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+@lru_cache(maxsize=65536)
+def _sniff(uasset: str, identity) -> str:
+    try:
+        pkg = read_package(vfs.read_bytes(uasset))
+    except (UAssetError, OSError) as e:
+        logger.debug(f"[类型识别] 无法读取 {uasset}: {e}")
+        return None
+    stem = path.splitext(path.basename(uasset))[0].lower()
+    # 主导出对象：与包同名的顶层对象，其次第一个顶层对象
+    top = [e for e in pkg.exports if e.outer_index == 0]
+    main = next((e for e in top if e.object_name.lower() == stem), top[0] if top else None)
+    if main is None:
+        return None
+    return pkg.class_name(main) or None
+
+
+def asset_class(file_path: str) -> str:
+    """资源包（.uasset / .uexp 任一路径）主导出对象的类名；无法识别时返回 None"""
+    uasset = path.splitext(file_path)[0] + ".uasset"
+    identity = _identity(uasset)
+    if identity is None:
+        return None
+    return _sniff(uasset, identity)
+
+
+def is_texture(file_path: str) -> bool:
+    """交给贴图流程：已识别为贴图，或无法识别（保持原先一律尝试 umodel 的行为）"""
+    cls = asset_class(file_path)
+    return cls is None or cls in TEXTURE_CLASSES
+
+
+def is_spine(file_path: str) -> bool:
+    """已识别为 Spine 图集 / 骨骼数据；无法识别时返回 None，由调用方按文件名判断"""
+    cls = asset_class(file_path)
+    return None if cls is None else cls in SPINE_CLASSES
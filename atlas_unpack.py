@@ -2,6 +2,7 @@
 import os
 from PIL import Image
 from loguru import logger
+from png_encode import get_profile
 
 
 def premultiply_alpha(image):
@@ -21,14 +22,26 @@ def premultiply_alpha(image):
     return image
 
 
-def split_atlas(fileName, output_path: str = None, atlas_path: str = None): # type: ignore
+def _page_path(atlas_dir: str, png_name: str) -> str:
+    """图集页图片路径：以 WebP 档位导出时页图片是同名 .webp"""
+    webp_name = os.path.splitext(png_name)[0] + ".webp"
+    for candidate in (os.path.join(atlas_dir, png_name), os.path.join(atlas_dir, webp_name),
+                      os.path.join(atlas_dir, "Textures", png_name), os.path.join(atlas_dir, "Textures", webp_name)):
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def split_atlas(fileName, output_path: str = None, atlas_path: str = None, profile: str = None): # type: ignore
     '''
     :param fileName: 文件名
     :param output_path: 输出目录
     :param atlas_path: 图集.atlas文件
+    :param profile: 输出档位（archive / fast / webp-lossless），为空时读取配置
     :return:
     '''
     logger.info(f"开始拆分图集: {atlas_path}")
+    output = get_profile(profile)
     if output_path is None:
         output_path = os.path.join(os.getcwd(), fileName)
     if atlas_path is None:
@@ -50,13 +63,10 @@ def split_atlas(fileName, output_path: str = None, atlas_path: str = None): # ty
                     break
             elif ".png" in _line:
                 png_name = _line.strip("\n")
-                png_path = os.path.join(os.path.split(atlas_path)[0], png_name)
-                if not os.path.exists(png_path):
-                    logger.warning(f"未找到 PNG 文件: {png_path}")
-                    png_path = os.path.join(os.path.split(atlas_path)[0], "Textures", png_name)
-                    if not os.path.exists(png_path):
-                        logger.error(f"仍然未找到 PNG 文件: {png_path}")
-                        raise ValueError(f"找不到图像文件: {png_name}")
+                png_path = _page_path(os.path.split(atlas_path)[0], png_name)
+                if png_path is None:
+                    logger.error(f"未找到 PNG 文件: {png_name}")
+                    raise ValueError(f"找不到图像文件: {png_name}")
 
                 ori_image = Image.open(png_path)
 
@@ -79,7 +89,9 @@ def split_atlas(fileName, output_path: str = None, atlas_path: str = None): # ty
                         continue
                     elif line1.strip("\n").endswith('.png'):
                         png_name = line1.strip("\n")
-                        png_path = os.path.join(os.path.split(atlas_path)[0], png_name)
+                        png_path = _page_path(os.path.split(atlas_path)[0], png_name)
+                        if png_path is None:
+                            raise ValueError(f"找不到图像文件: {png_name}")
                         ori_image = Image.open(png_path)
                         for i in range(4):
                             if i == 0:
@@ -104,7 +116,7 @@ def split_atlas(fileName, output_path: str = None, atlas_path: str = None): # ty
                         else:
                             rotate_angle = int(rotate)
                         rotate = rotate_angle > 0
-                        name = line1.replace("\n", "") + ".png"
+                        name = line1.replace("\n", "") + output.ext
                         if '/' in name:
                             os.makedirs(os.path.join(output_path, '/'.join(name.split('/')[:-1])), exist_ok=True)
                         width, height = list(map(int, size.split(":")[1].split(",")))
@@ -127,7 +139,7 @@ def split_atlas(fileName, output_path: str = None, atlas_path: str = None): # ty
                             rect_on_big = rect_on_big.rotate(-rotate_angle, expand=True)
 
                         result_image.paste(rect_on_big, (offset_x, origy - height - offset_y))
-                        result_image.save(output_path + '/' + name)
+                        output.save(result_image, output_path + '/' + name)
                         logger.info(f"保存图像: {output_path + '/' + name}")
 
 
@@ -22,8 +22,10 @@ class ConfigManager:
     _loaded_once = False
     _REQUIRED_KEYS = \
         ("ffm_path", "umo_path", "vgm_path", "quickbms_path", "spine_path",
-         "max_workers", "UseCNName",
-         "pak_path", "unpack_path", "resource_path",
+         "max_workers", "UseCNName", "png_workers", "png_compress_level",
+         "output_profile", "texture_cache_mb", "texture_variant_suffixes", "texture_variant_prefer",
+         "tool_slots", "cpu_slots", "io_slots",
+         "pak_path", "unpack_path", "resource_path", "pak_include", "pak_exclude",
          "past_path", "new_path", "increase_path", )
     _TEMPLATE = {
         "ffm_path": r"{root}\tool\ffmpeg\bin\ffmpeg.exe",
@@ -33,9 +35,28 @@ class ConfigManager:
         "spine_path": r"{root}\tool\spine\Spine.exe",
         "max_workers": 2,
         "UseCNName": False,
+        "png_workers": 0,
+        "png_compress_level": 6,
+        "output_profile": "archive",
+        "texture_cache_mb": 4096,
+        "texture_variant_suffixes": [r"_144"],
+        "texture_variant_prefer": "largest",
+        "tool_slots": 0,
+        "cpu_slots": 0,
+        "io_slots": 0,
         "pak_path": r"NULL\Snow\data\game\Game\Content\Paks",
         "unpack_path": r"{root}\unpack",
         "resource_path": r"{root}\unpack",
+        "pak_include": [
+            r"Game\Content\Plot\CgPlot\*",
+            r"Game\Content\Spine\Hero\*",
+            r"Game\Content\UI\Pose\Ser\*",
+            r"Game\Content\UI\Pose\Fashion\*",
+            r"Game\Content\UI\Picture\Dialogue\*",
+            r"Game\Content\Wwise\Windows\*",
+            r"Game\Content\Settings\*",
+        ],
+        "pak_exclude": [],
         "past_path": "NULL",
         "new_path": "NULL",
         "increase_path": r"{root}\increase",
@@ -48,10 +69,21 @@ class ConfigManager:
     "spine_path": Spine.exe 文件路径
     "max_workers": 多线程数
     "UseCNName": 音频文件应用匹配到的中文名
+    "png_workers": PNG 编码进程数(0 表示与 cpu_slots 相同，不超过 cpu_slots)
+    "png_compress_level": PNG 压缩等级 0~9(越大越小越慢)
+    "output_profile": 贴图输出档位 archive(归档 PNG) / fast(低压缩 PNG，快速预览) / webp-lossless(无损 WebP)
+    "texture_cache_mb": 贴图转换缓存上限(MB，0 表示关闭)，位于 ./cache/textures
+    "texture_variant_suffixes": 贴图尺寸 / 质量变体后缀(正则列表，默认只有 _144)，同名不同后缀的贴图只转换一份
+    "texture_variant_prefer": 变体取舍 largest(保留最大) / smallest(保留最小)
+    "tool_slots": 同时运行的外部工具(umodel / vgmstream / ffmpeg)数(0 表示 CPU 核数)
+    "cpu_slots": 同时进行的 CPU 计算(贴图解码、图片编码、图集拆分)数(0 表示 CPU 核数)
+    "io_slots": 同时进行的磁盘读写(资源包落盘、哈希)数(0 表示 4)
     # 解密解包 设置路径
     "pak_path": snow_pak 文件夹路径
     "unpack_path": INPUT路径 解密完成，待提取资源 文件夹路径(可选，默认为 "./unpack")
     "resource_path": OUT路径 提取资源导出 文件夹路径(可选，默认为 "./unpack")
+    "pak_include": 按需解包时只写出匹配的条目(通配符列表，为空表示全部)
+    "pak_exclude": 按需解包时排除匹配的条目(通配符列表)
     # 提取增量资源 设置路径
     "past_path": 旧版本 解包文件夹路径
     "new_path": 新版本 解包文件夹路径
@@ -114,6 +146,9 @@ class ConfigManager:
             try:
                 with open(self.file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
+                if self._fill_missing(data):
+                    logger.info("配置缺少新版本设置项，已补全默认值")
+                    self._write(data)
                 if self._validate_config(data):
                     self.config = data
                     if not ConfigManager._loaded_once:
@@ -138,6 +173,16 @@ class ConfigManager:
         """检查是否包含全部必需键"""
         return all(k in data for k in self._REQUIRED_KEYS)
 
+    def _fill_missing(self, data: dict) -> bool:
+        """用模板补全旧版本配置中缺失的键，保留用户已有设置"""
+        if not isinstance(data, dict) or not data:
+            return False
+        template = self._render_template()
+        missing = [k for k in self._REQUIRED_KEYS if k not in data]
+        for k in missing:
+            data[k] = template[k]
+        return bool(missing)
+
     def _render_template(self) -> dict:
         """把 {root} 占位符替换成实际路径"""
         return {k: v.format(root=ROOT_DIR) if isinstance(v, str) else v for k, v in self._TEMPLATE.items()}
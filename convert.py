@@ -1,155 +1,393 @@
-from os import (path, listdir, walk,
-                cpu_count, remove, makedirs)
+from os import (path, walk,
+                makedirs, link)
 import subprocess
-import binascii
+import mmap
+from contextlib import contextmanager
 from loguru import logger
-from PIL import Image
 from config_manager import ConfigManager
 from atlas_unpack import split_atlas
-from concurrent.futures import ThreadPoolExecutor
+from scheduler import scheduler, work_log
+from pak_vfs import vfs
+from texture_export import export_texture_png
+from png_encode import encode_pngs, get_profile, PngEncoder
+import texture_cache
+from texture_variants import resolve_variants, package_size
+from asset_sniff import is_texture, is_spine
 import json
+import shutil
 
 
 
 # 工具函数：检查目录是否存在
 def check_dir(_path: str, desc: str) -> bool:
-    if not path.isdir(_path):
+    if not vfs.isdir(_path):
         logger.warning(f"{desc} 不存在，跳过：{_path}")
         return False
     return True
 
 
-def png_convert(file_path, out_path):
+def _from_cache(file_path, out_path, encoder=None):
+    """查贴图缓存：返回 (是否命中, 缓存键)；命中时输出已放到 out_path"""
+    profile = encoder.profile if encoder is not None else get_profile()
+    cache_key = texture_cache.package_key(file_path, profile)
+    dest = path.join(out_path, path.splitext(path.basename(file_path))[0] + profile.ext)
+    if texture_cache.fetch(cache_key, dest):
+        logger.success(f"[缓存命中] {dest}")
+        return True, cache_key
+    return False, cache_key
+
+
+def _try_native(file_path, out_path, encoder=None):
+    """查贴图缓存，未命中时尝试原生导出：返回 (是否已导出, 缓存键)，未导出的交给 umodel"""
+    makedirs(out_path, exist_ok=True)
+    hit, cache_key = _from_cache(file_path, out_path, encoder)
+    # 常见像素格式直接解码，不启动 umodel
+    return hit or export_texture_png(file_path, out_path, encoder, cache_key), cache_key
+
+
+def png_convert(file_path, out_path, encoder=None):
+    """导出单个贴图；encoder 为 PNG 编码阶段，为空时在当前线程编码"""
+    done, cache_key = _try_native(file_path, out_path, encoder)
+    if not done:
+        _umodel_convert(file_path, out_path, encoder, cache_key)
+
+
+def _umodel_convert(file_path, out_path, encoder=None, cache_key=None):
+    """用 umodel 导出单个贴图（调用方已查过缓存、试过原生导出）"""
     import tempfile
     cfg = ConfigManager()
     root, name = path.split(file_path)
     file_name = path.splitext(name)[0]
     umo_path = str(cfg.get("umo_path"))
 
+    makedirs(out_path, exist_ok=True)
     if not path.isfile(umo_path):
         logger.critical(f"[路径无效] UModel 路径不存在: {umo_path}")
         return
 
-    if not path.exists(root):
+    if not vfs.exists(root):
         logger.critical(f"[路径无效] 文件所在目录不存在: {root}")
         return
 
-    if not path.exists(file_path):
+    if not vfs.exists(file_path):
         logger.critical(f"[目标文件缺失] 指定文件不存在: {file_path}")
         return
 
+    # 每个任务独立的临时目录：umodel 只往里面写，按确切文件名找 TGA，不扫描共享的输出目录
+    scratch = tempfile.mkdtemp(prefix=".cbunpak_", dir=out_path)
+    export_dir = path.join(scratch, "export")
     try:
+        # 直接从 pak 读取时，umodel 需要真实文件：把该资源包写到临时目录
+        if vfs.is_virtual(file_path):
+            with scheduler.slot("io"):
+                root = path.dirname(vfs.materialize(file_path, path.join(scratch, "pkg")))
+
         # 使用临时文件收集stderr
-        with tempfile.TemporaryFile(mode='w+', encoding='utf-8') as err_log:
-            subprocess.run([
+        with tempfile.TemporaryFile(mode='w+', encoding='utf-8') as err_log, scheduler.slot("tool"):
+            result = subprocess.run([
                 umo_path,
                 f"-path={root}",
                 "-game=ue4.26",
                 "-export",
-                f"-out={out_path}",
+                f"-out={export_dir}",
                 file_name
             ],
-                check=True,
                 stdout=subprocess.DEVNULL,
                 stderr=err_log)
-
-            # 检查是否导出成功的 .tga 文件
-            tga_candidates = [f for f in listdir(out_path) if f.endswith('.tga') and file_name in f]
-            if not tga_candidates:
-                logger.error(f"[TGA 导出失败] 未生成任何匹配 TGA 文件（{file_name}.tga）")
+            if result.returncode != 0:
+                err_log.seek(0)
+                error_output = err_log.read().strip()
+                logger.error(f"[UModel 执行失败] 导出命令返回码 {result.returncode}")
+                if error_output:
+                    logger.debug(f"[UModel stderr]\n{error_output}")
+                else:
+                    logger.warning(f"[无详细错误] 可能原因包括：文件名错误、未识别的资源或格式不兼容")
                 return
 
-            tga = path.join(out_path, tga_candidates[0])
-            png = path.join(out_path, f"{file_name}.png")
-
-            try:
-                img = Image.open(tga)
-                img.save(png, "PNG")
-                logger.success(f"[成功] PNG 生成成功: {png}")
-                remove(tga)
-            except Exception as e:
-                logger.error(f"[图像处理失败] 无法处理 TGA 文件 {tga} → {e}")
-
-    except subprocess.CalledProcessError as e:
-        err_log.seek(0)
-        error_output = err_log.read().strip()
-        logger.error(f"[UModel 执行失败] 导出命令返回码 {e.returncode}")
-        if error_output:
-            logger.debug(f"[UModel stderr]\n{error_output}")
-        else:
-            logger.warning(f"[无详细错误] 可能原因包括：文件名错误、未识别的资源或格式不兼容")
-
-    except FileNotFoundError:
-        logger.error(f"[文件缺失] TGA 文件未生成，或路径错误: {file_name}.tga")
+        tga_files = [path.join(r, f) for r, _, fs in walk(export_dir) for f in fs if f.endswith(".tga")]
+        tga = _match_tgas(tga_files, [file_name]).get(file_name)
+        if tga is None:
+            logger.error(f"[TGA 导出失败] 未生成任何匹配 TGA 文件（{file_name}.tga）")
+            return
+
+        # 临时目录交给编码阶段，PNG 写完后删除
+        owned, scratch = scratch, None
+        encode_pngs([(tga, path.join(out_path, file_name), cache_key)], owned, encoder)
 
     except Exception as e:
         logger.exception(f"[未知错误] 在转换过程中发生异常: {e}")
 
+    finally:
+        if scratch:
+            shutil.rmtree(scratch, ignore_errors=True)
 
-def convert_png_single(file, root, input_path, output_path):
-    out_dir = path.join(output_path, root.replace(input_path, "").strip("\\"))
-    makedirs(out_dir, exist_ok=True)
-    png_convert(path.join(root, file), out_dir)
 
+def _match_tgas(tga_files, file_names):
+    """
+    把导出的 TGA 对应回源文件名：只认文件名（不含扩展名）与源文件完全相同的 TGA（不区分大小写），
+    没有同名 TGA 的源文件不出现在结果中，由调用方报告；不再退回“包含源文件名”的模糊匹配，
+    避免某个贴图导出失败时误用 Bg_01_2.tga 之类的同前缀图片
+    """
+    by_name = {}
+    for t in sorted(tga_files):
+        by_name.setdefault(path.splitext(path.basename(t))[0].lower(), t)
+    return {file_name: by_name[file_name.lower()] for file_name in file_names if file_name.lower() in by_name}
 
-def convert_to_png(input_path, output_path):
-    if not check_dir(input_path, "输入目录"):
+
+def _stage_package(file_path, dest_dir):
+    """把资源包（.uasset / .uexp / .ubulk）放进 dest_dir：虚拟文件写出，真实文件优先硬链接"""
+    if vfs.is_virtual(file_path):
+        vfs.materialize(file_path, dest_dir)
+        return
+    makedirs(dest_dir, exist_ok=True)
+    stem = path.splitext(file_path)[0]
+    for ext in (".uasset", ".uexp", ".ubulk"):
+        src = stem + ext
+        if not path.isfile(src):
+            continue
+        dst = path.join(dest_dir, path.basename(src))
+        try:
+            link(src, dst)
+        except OSError:
+            shutil.copyfile(src, dst)
+
+
+def png_convert_dir(root, files, out_path, encoder=None, cache_keys=None):
+    """
+    同一目录下的多个贴图只启动一次 umodel：先把要转换的资源包集中到临时目录
+    （umodel 会递归扫描 -path，直接指向源目录会连子目录一起导出），以 *.uasset 通配导出，
+    再把生成的 TGA 按文件名对应回各个源文件；批量导出失败时退回逐个导出。
+    files 为缓存未命中、也无法原生导出的贴图，cache_keys 为其 {文件名: 缓存键}
+    """
+    import tempfile
+    makedirs(out_path, exist_ok=True)
+    cache_keys = cache_keys or {}
+    if not files:
+        return
+    cfg = ConfigManager()
+    umo_path = str(cfg.get("umo_path"))
+    file_names = [path.splitext(f)[0] for f in files]
+
+    if not path.isfile(umo_path):
+        logger.critical(f"[路径无效] UModel 路径不存在: {umo_path}")
         return
-    _file_list = []
-    for root, dirs, files in walk(input_path):
-        for file in files:
-            if file.endswith(".uexp") and "_144." not in file:
-                _file_list.append([file, root])
 
-    max_workers = min(32, (cpu_count() or 1) * 4)
+    # 临时目录放在输出目录下，与源文件同盘时可以硬链接
+    scratch = tempfile.mkdtemp(prefix=".cbunpak_", dir=out_path)
+    export_dir = path.join(scratch, "export")
+    pkg_root = path.join(scratch, "pkg")
+    try:
+        with scheduler.slot("io"):
+            for f in files:
+                _stage_package(path.join(root, f), pkg_root)
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # 提交所有任务到线程池，并传入索引 i
-        futures = [
-            executor.submit(convert_png_single, file, root, input_path, output_path)
-            for file, root in _file_list
-        ]
+        with tempfile.TemporaryFile(mode='w+', encoding='utf-8') as err_log:
+            with scheduler.slot("tool"):
+                result = subprocess.run([
+                    umo_path,
+                    f"-path={pkg_root}",
+                    "-game=ue4.26",
+                    "-export",
+                    f"-out={export_dir}",
+                    "*.uasset"
+                ],
+                    stdout=subprocess.DEVNULL,
+                    stderr=err_log)
+            if result.returncode != 0:
+                err_log.seek(0)
+                logger.warning(f"[UModel 批量导出失败] 返回码 {result.returncode}，改为逐个导出: {root}")
+                logger.debug(f"[UModel stderr]\n{err_log.read().strip()}")
+                for f in files:
+                    _umodel_convert(path.join(root, f), out_path, encoder, cache_keys.get(f))
+                return
 
-        # 可选：等待所有任务完成（with 语句会自动等待）
-        for future in futures:
-            future.result()  # 检查是否有异常
+        tga_files = [path.join(r, f) for r, _, fs in walk(export_dir) for f in fs if f.endswith(".tga")]
+        matched = _match_tgas(tga_files, file_names)
+        jobs = []
+        for f, file_name in zip(files, file_names):
+            if file_name not in matched:
+                logger.error(f"[TGA 导出失败] 未生成任何匹配 TGA 文件（{file_name}.tga）")
+                continue
+            jobs.append((matched[file_name], path.join(out_path, file_name), cache_keys.get(f)))
+        owned, scratch = scratch, None
+        encode_pngs(jobs, owned, encoder)
 
+    except Exception as e:
+        logger.exception(f"[未知错误] 在批量转换 {root} 时发生异常: {e}")
 
-def split_and_save(text_data, clean_filename):
+    finally:
+        if scratch:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+def _out_dir(root, input_path, output_path):
+    """root（input_path 下的目录）对应的输出目录；用 relpath 而不是去掉前缀，POSIX 上不会留下开头的 /"""
+    rel = path.relpath(root, input_path)
+    return output_path if rel == "." else path.join(output_path, rel)
+
+
+def convert_png_dir(files, root, input_path, output_path, encoder=None, cache_keys=None):
+    """umodel 阶段：files 为 root 中需要 umodel 导出的贴图，cache_keys 为其 {文件名: 缓存键}"""
+    out_dir = _out_dir(root, input_path, output_path)
+    makedirs(out_dir, exist_ok=True)
+    if len(files) == 1:
+        _umodel_convert(path.join(root, files[0]), out_dir, encoder, (cache_keys or {}).get(files[0]))
+    else:
+        png_convert_dir(root, files, out_dir, encoder, cache_keys)
+
+
+def _content_key(root, file, output):
+    with scheduler.slot("io"):
+        return texture_cache.content_key(path.join(root, file), output)
+
+
+def _dedupe(dir_list, input_path, output_path, output):
+    """
+    本轮运行中内容相同的贴图（不同剧情目录、UI 目录下的同一张立绘 / 背景）只转换一次：
+    首个输出登记在 work_log 中，同一轮里之后的 convert_to_png 调用遇到相同内容也直接链接过去。
+    返回去重后的目录列表、本次负责转换的内容键，以及 [(首个输出, 完成事件, 重复输出)]
+    """
+    items = [(root, file) for files, root in dir_list for file in files]
+    keys = scheduler.map(_content_key, [(root, file, output) for root, file in items])
+
+    kept, owned, links = {}, [], []
+    for (root, file), key in zip(items, keys):
+        dest = path.join(_out_dir(root, input_path, output_path), path.splitext(file)[0] + output.ext)
+        first = work_log.share_output(key, dest) if key is not None else None
+        if first is not None:
+            if first[0] != dest:
+                links.append((*first, dest))
+            continue
+        if key is not None:
+            owned.append(key)
+        kept.setdefault(root, []).append(file)
+    return [[files, root] for root, files in kept.items()], owned, links
+
+
+def _link_duplicates(links):
+    """等首个输出生成后，把重复贴图的输出硬链接（跨盘时复制）过去"""
+    linked = 0
+    for src, done, dst in links:
+        done.wait()
+        if not path.isfile(src):
+            logger.warning(f"[去重] 源贴图未生成，跳过: {dst}")
+            continue
+        try:
+            makedirs(path.dirname(dst), exist_ok=True)
+            texture_cache.link_or_copy(src, dst)
+            linked += 1
+        except OSError as e:
+            logger.error(f"[去重] 链接失败 {dst}: {e}")
+    if linked:
+        logger.info(f"[去重] {linked} 个重复贴图直接链接到已转换的输出")
+
+
+def _work_key(*parts):
+    """工作项键：路径统一为绝对路径，不同写法的同一目录视为同一项"""
+    return tuple(path.normcase(path.abspath(p)) if isinstance(p, str) and i else p for i, p in enumerate(parts))
+
+
+def _convert_dirs(dir_list, input_path, output_path, profile=None):
+    """转换去重后的目录列表：先按文件查缓存 / 原生导出，剩下的按目录交给 umodel"""
+    # 调度线程只负责等待 umodel / 读取解码，PNG 压缩交给独立的进程池
+    with PngEncoder(profile=profile) as encoder:
+        # 缓存查找与原生解码按文件提交，同一目录里的多张大图分到各个 cpu 槽并行解码；按数据量从大到小提交
+        items = [(root, f) for files, root in dir_list for f in files]
+        results = scheduler.map(_try_native, [(path.join(root, f), _out_dir(root, input_path, output_path), encoder)
+                                              for root, f in items],
+                                size=lambda file_path, *_: package_size(path.dirname(file_path),
+                                                                        path.splitext(path.basename(file_path))[0]))
+        leftovers = {}
+        for (root, f), (done, cache_key) in zip(items, results):
+            if not done:
+                leftovers.setdefault(root, {})[f] = cache_key
+
+        # 剩下的（不支持的像素格式等）每个目录一个任务，只启动一次 umodel；按目录历史耗时 / 数据量从大到小提交
+        scheduler.map(convert_png_dir, [(list(keys), root, input_path, output_path, encoder, keys)
+                                        for root, keys in leftovers.items()],
+                      key=lambda files, root, *_: f"png:{root}",
+                      size=lambda files, root, *_: sum(package_size(root, path.splitext(f)[0]) for f in files))
+
+
+def convert_to_png(input_path, output_path, profile=None):
+    """profile 为输出档位（archive / fast / webp-lossless），为空时读取配置 output_profile"""
+    if not check_dir(input_path, "输入目录"):
+        return
+    output = get_profile(profile)
+    with work_log.run():
+        # 按目录分组，每个目录只启动一次 umodel；只收贴图（Spine 图集 / 骨骼、音频等不交给 umodel），
+        # 同名的尺寸 / 质量变体只保留一份
+        _dir_list = []
+        for root, dirs, files in vfs.walk(input_path):
+            textures = resolve_variants(root, [file for file in files
+                                               if file.endswith(".uexp") and is_texture(path.join(root, file))])
+            if textures:
+                _dir_list.append([textures, root])
+        # 本轮已经转换过的目录（如 convert_spine 内部再次调用）直接跳过
+        _dir_list = work_log.claim(_dir_list, lambda item: _work_key(
+            f"png:{output.name}", item[1], _out_dir(item[1], input_path, output_path)))
+        if not _dir_list:
+            return
+
+        _dir_list, owned, links = _dedupe(_dir_list, input_path, output_path, output)
+
+        try:
+            _convert_dirs(_dir_list, input_path, output_path, profile)
+        finally:
+            # 本次负责的贴图已写完（或失败），其它调用中等着链接它们的重复贴图可以继续
+            work_log.finish_outputs(owned)
+        _link_duplicates(links)
+    texture_cache.evict()
+
+
+def split_and_save(data, clean_filename):
+    """
+    data 为 .uexp 的字节内容（bytes / mmap），直接按字节查找标记，只解码 atlas 与 json 两段；
+    标记都是 ASCII，与整体解码后再查找的结果一致
+    """
     try:
         # 查找文件内容
-        start_png = text_data.find(f'{clean_filename}.png')
-        end_atlas = text_data.rfind('index: -1') + len('index: -1')
-        atlas_content = text_data[start_png:end_atlas] if start_png != -1 and end_atlas != -1 else ''
+        start_png = data.find(f'{clean_filename}.png'.encode('utf-8'))
+        end_atlas = data.rfind(b'index: -1') + len(b'index: -1')
+        atlas_content = data[start_png:end_atlas].decode('utf-8', errors='ignore') \
+            if start_png != -1 and end_atlas != -1 else ''
 
-        start_json = text_data.find('{\n"skeleton": {')
+        start_json = data.find(b'{\n"skeleton": {')
         if start_json == -1:
-            start_json = text_data.find('{"skeleton":{"hash":')  # 修改匹配条件
-        end_json = text_data.rfind('}')
-        json_content = text_data[start_json:end_json + 1] if start_json != -1 and end_json != -1 else ''
+            start_json = data.find(b'{"skeleton":{"hash":')  # 修改匹配条件
+        end_json = data.rfind(b'}')
+        json_content = data[start_json:end_json + 1].decode('utf-8', errors='ignore') \
+            if start_json != -1 and end_json != -1 else ''
         return atlas_content, json_content
     except Exception as e:
         logger.error(f"拆分和保存时出现异常: {e}")
         return False, False
 
 
+@contextmanager
+def _map_file(file_path):
+    """真实文件只读 mmap，不整体读入内存；pak 中的虚拟文件（或空文件）退回读取的字节"""
+    if vfs.entry_hash(file_path) is not None or path.getsize(file_path) == 0:
+        yield vfs.read_bytes(file_path)
+        return
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        yield mm
+
+
 def convert_spine_single(filename, root, input_path, output_path):
     cfg = ConfigManager()
     file_path = path.join(root, filename)
+    original_filename = path.splitext(filename)[0]
+    clean_filename = original_filename.replace('-atlas', '').replace('-data', '')
     try:
-        with open(file_path, 'rb') as file:
-            hex_data = binascii.hexlify(file.read())
-            text_data = bytes.fromhex(hex_data.decode('utf-8')).decode('utf-8', errors='ignore')
+        with scheduler.slot("io"), _map_file(file_path) as data:
+            # 尝试拆分并保存为 atlas 和 json 文件
+            atlas_content, json_content = split_and_save(data, clean_filename)
     except Exception as e:
         logger.error(f"读取文件失败: {e}")
         return
 
-    # 尝试拆分并保存为 atlas 和 json 文件
-    original_filename = path.splitext(filename)[0]
-    clean_filename = original_filename.replace('-atlas', '').replace('-data', '')
-    atlas_content, json_content = split_and_save(text_data, clean_filename)
-
-    out_dir = path.join(output_path, root.replace(input_path, "").strip("\\"))
+    out_dir = _out_dir(root, input_path, output_path)
     makedirs(out_dir, exist_ok=True)
 
     # 保存 atlas 文件
@@ -170,54 +408,45 @@ def convert_spine_single(filename, root, input_path, output_path):
             cfg.Json_list.append(json_path)
 
 
-def convert_atlas_single(filename, root):
+def convert_atlas_single(filename, root, profile=None):
     atlas_path = path.join(root, filename)
     unit_name = path.split(filename)[1]
     output_path_images = path.join(root, 'images')
     makedirs(output_path_images, exist_ok=True)
-    split_atlas(unit_name, output_path=output_path_images, atlas_path=atlas_path)
+    with scheduler.slot("cpu"):
+        split_atlas(unit_name, output_path=output_path_images, atlas_path=atlas_path, profile=profile)
 
 
-def convert_spine(input_path, output_path):
+def convert_spine(input_path, output_path, profile=None):
     if not check_dir(input_path, "输入路径"):
         return
-    _file_list = []
-    for root, dirs, files in walk(input_path):
-        for filename in files:
-            if filename.endswith(".uexp") and "_a" not in filename:
-                _file_list.append([filename, root])
-    max_workers = min(32, (cpu_count() or 1) * 4)
-
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # 提交所有任务到线程池，并传入索引 i
-        futures = [
-            executor.submit(convert_spine_single, filename, root, input_path, output_path)
-            for filename, root in _file_list
-        ]
-
-        # 可选：等待所有任务完成（with 语句会自动等待）
-        for future in futures:
-            future.result()  # 检查是否有异常
-
-    convert_to_png(input_path, output_path)
-    _file_list = []
-    # 拆分 atlas 文件
-    for root, dirs, files in walk(output_path):
-        for filename in files:
-            if filename.endswith(".atlas"):
-                _file_list.append([filename, root])
-    max_workers = min(32, (cpu_count() or 1) * 4)
-
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # 提交所有任务到线程池，并传入索引 i
-        futures = [
-            executor.submit(convert_atlas_single, filename, root)
-            for filename, root in _file_list
-        ]
-
-        # 可选：等待所有任务完成（with 语句会自动等待）
-        for future in futures:
-            future.result()  # 检查是否有异常
+    with work_log.run():
+        _file_list = []
+        for root, dirs, files in vfs.walk(input_path):
+            for filename in files:
+                if not filename.endswith(".uexp"):
+                    continue
+                # 按资源类型分流；识别不了时沿用按文件名的判断
+                spine = is_spine(path.join(root, filename))
+                if spine or spine is None and "_a" not in filename:
+                    _file_list.append([filename, root])
+        _file_list = work_log.claim(_file_list, lambda item: _work_key(
+            "spine", path.join(item[1], item[0]), _out_dir(item[1], input_path, output_path)))
+        scheduler.map(convert_spine_single, [(filename, root, input_path, output_path) for filename, root in _file_list],
+                      size=lambda filename, root, *_: vfs.getsize(path.join(root, filename)))
+
+        convert_to_png(input_path, output_path, profile)
+        _file_list = []
+        # 拆分 atlas 文件
+        for root, dirs, files in walk(output_path):
+            for filename in files:
+                if filename.endswith(".atlas"):
+                    _file_list.append([filename, root])
+        atlas_op = f"atlas:{get_profile(profile).name}"
+        _file_list = work_log.claim(_file_list, lambda item: _work_key(atlas_op, path.join(item[1], item[0])))
+        scheduler.map(convert_atlas_single, [(filename, root, profile) for filename, root in _file_list],
+                      key=lambda filename, root, _: f"atlas:{path.join(root, filename)}",
+                      size=lambda filename, root, _: path.getsize(path.join(root, filename)))
 
 
 if __name__ == '__main__':
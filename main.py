@@ -11,6 +11,11 @@ from CBUnpack3 import CBUNpakMain
 from CBUnpack import CBUNpakIncr
 from check import check_tool_availability
 from convert import convert_to_png
+from pak_extract import extract_paks
+from pak_diff import diff_installs, write_diff_report
+from pak_catalog import open_catalog, add_version, guess_version_name, list_versions, first_seen, \
+    last_changed, which_pak, dir_growth
+from pak_vfs import vfs
 import subprocess
 from spinejsonexport2 import sjemain
 from config_manager import ConfigManager
@@ -110,11 +115,17 @@ def choice_check():
     check_tool_availability()
 
 
-def SnowUnpack():
+def SnowUnpack(selective: bool = False):
     cfg = ConfigManager()
     pak_path = str(cfg.get("pak_path"))
     quickbms_path = str(cfg.get("quickbms_path"))
     unpack_path = str(cfg.get("unpack_path"))
+    if selective:
+        # 原生解包：只写出 pak_include / pak_exclude 匹配的条目
+        # 就地更新已有的输出目录：未变的文件不重写，游戏中已删除的文件同步删除
+        makedirs(unpack_path, exist_ok=True)
+        extract_paks(pak_path, unpack_path, cfg.get("pak_include"), cfg.get("pak_exclude"), update=True)
+        return
     if path.exists(unpack_path):
         shutil.rmtree(unpack_path)
     makedirs(unpack_path)
@@ -133,8 +144,10 @@ def choice_CBUNpakMain():
         choices=[
             {"name": "请选择操作：", "disabled": "↑↓选择"},  # 禁用选项
             questionary.Separator(),  # 视觉分隔线
-            {"name": "0.是", "value": True},
-            {"name": "1.否", "value": False},
+            {"name": "0.是（按需解包，仅流程所需目录）", "value": "selective"},
+            {"name": "1.是（quickbms 完整解包）", "value": "full"},
+            {"name": "2.否", "value": False},
+            {"name": "3.否，直接从 pak 读取资源（不写出解包文件）", "value": "vfs"},
         ],
         use_arrow_keys=True  # 启用箭头导航
     ).ask()
@@ -167,8 +180,11 @@ def choice_CBUNpakMain():
     cfg.Json_list = []
 
     # 处理用户选择
-    if choice1:
-        SnowUnpack()
+    if choice1 == "vfs":
+        # 把 Paks 挂载到 unpack_path，资源整理直接从 pak 读取
+        vfs.mount(str(cfg.get("pak_path")), str(cfg.get("unpack_path")))
+    elif choice1:
+        SnowUnpack(selective=choice1 == "selective")
 
     if choice2 == 0:
         CBUNpakMain()
@@ -189,6 +205,8 @@ def choice_alone():
             {"name": "2.BGM背景音乐独立分离打标", "value": "BGM"},
             {"name": "3.VOICE女孩语音独立分离打标", "value": "VOICE"},
             {"name": "4.IMG图片遍历解包", "value": "IMG"},
+            {"name": "5.PAK版本差异对比(无需解包)", "value": "DIFF"},
+            {"name": "6.PAK版本目录查询(SQLite)", "value": "CATALOG"},
         ],
         use_arrow_keys=True  # 启用箭头导航
     ).ask()
@@ -203,6 +221,10 @@ def choice_alone():
         choice_debug()
     elif choice == "IMG":
         choice_Oimg()
+    elif choice == "DIFF":
+        choice_pak_diff()
+    elif choice == "CATALOG":
+        choice_pak_catalog()
     elif choice is None:
         logger.debug("检测程序已被用户中断，正在退出...")
         sys.exit(0)
@@ -226,6 +248,71 @@ def choice_Oimg():
         convert_to_png(_p1, _p2)
 
 
+def choice_pak_diff():
+    cfg = ConfigManager()
+    old_pak = open_folder_dialog("选择旧版本 Paks 文件夹")
+    new_pak = open_folder_dialog("选择新版本 Paks 文件夹")
+    if not old_pak or not new_pak:
+        return
+
+    increase_path = str(cfg.get("increase_path"))
+    result = diff_installs(old_pak, new_pak)
+    write_diff_report(result, path.join(increase_path, "PAK差异清单.txt"))
+
+    extract = questionary.confirm("是否按需解包新增/修改的条目到增量目录？", default=False).ask()
+    if extract:
+        changed = set(result["added"]) | set(result["modified"])
+        extract_paks(new_pak, path.join(increase_path, "unpack"),
+                     cfg.get("pak_include"), cfg.get("pak_exclude"), only=changed)
+
+
+def choice_pak_catalog():
+    conn = open_catalog()
+    try:
+        action = questionary.select(
+            "版本目录",
+            choices=[
+                {"name": "0.录入版本(选择 Paks 文件夹)", "value": "add"},
+                {"name": "1.已录入的版本", "value": "list"},
+                {"name": "2.最早出现的版本", "value": "first"},
+                {"name": "3.最后修改的版本", "value": "changed"},
+                {"name": "4.所在 pak(最新版本)", "value": "pak"},
+                {"name": "5.目录各版本增长", "value": "growth"},
+            ],
+            use_arrow_keys=True
+        ).ask()
+        if action == "add":
+            pak_dir = open_folder_dialog("选择 Paks 文件夹")
+            if not pak_dir:
+                return
+            name = questionary.text("版本名：", default=guess_version_name(pak_dir)).ask()
+            if name:
+                add_version(conn, name, pak_dir)
+            return
+        if action == "list":
+            for name, count, size in list_versions(conn):
+                logger.info(f"{name}\t{count} 个文件\t{size / 1024 ** 2:.1f} MB")
+            return
+        if action is None:
+            return
+
+        prompt = "目录(如 Game/Content/UI)：" if action == "growth" else "路径通配符(如 */Sprite/*)："
+        pattern = questionary.text(prompt).ask()
+        if not pattern:
+            return
+        if action == "growth":
+            for name, count, size in dir_growth(conn, pattern):
+                logger.info(f"{name}\t{count} 个文件\t{size / 1024 ** 2:.1f} MB")
+            return
+        query = {"first": first_seen, "changed": last_changed, "pak": which_pak}[action]
+        rows = query(conn, pattern)
+        for row in rows[:200]:
+            logger.info("\t".join(str(v) for v in row))
+        logger.success(f"[版本目录] 共 {len(rows)} 条" + ("，仅显示前 200 条" if len(rows) > 200 else ""))
+    finally:
+        conn.close()
+
+
 def open_folder_dialog(title="选择文件夹"):
     # 打开文件夹选择对话框
     root = Tk()
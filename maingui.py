@@ -18,7 +18,7 @@ from PyQt6.QtWidgets import (
     QTabWidget, QLabel, QPushButton, QCheckBox, QRadioButton,
     QButtonGroup, QGroupBox, QTextEdit, QLineEdit, QSpinBox,
     QFileDialog, QMessageBox, QProgressBar, QScrollArea, QFrame,
-    QSplitter, QStatusBar
+    QSplitter, QStatusBar, QComboBox
 )
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer
 from PyQt6.QtGui import QFont, QTextCursor, QColor, QTextCharFormat, QIcon
@@ -355,6 +355,11 @@ class UnpackPage(QWidget):
         sync_btn_layout.addWidget(self.sync_to_resource_btn)
         pak_layout.addLayout(sync_btn_layout)
         
+        # 按需解包：只写出资源整理用到的目录
+        self.selective_checkbox = QCheckBox("仅解包资源整理所需目录 (按 config.json 中 pak_include / pak_exclude 过滤)")
+        self.selective_checkbox.setChecked(True)
+        pak_layout.addWidget(self.selective_checkbox)
+        
         # PAK解密按钮
         self.pak_decrypt_btn = QPushButton("开始解密PAK")
         self.pak_decrypt_btn.setMinimumHeight(36)
@@ -410,6 +415,10 @@ class UnpackPage(QWidget):
         
         resource_layout.addWidget(mode_subgroup)
         
+        # 直接从PAK读取：不需要先解密PAK，UE资源路径仅作为虚拟挂载点
+        self.vfs_checkbox = QCheckBox("直接从PAK读取资源 (无需先解密PAK，仅全部默认资源模式)")
+        resource_layout.addWidget(self.vfs_checkbox)
+        
         # 增量模式额外选项
         self.incr_options_widget = QWidget()
         incr_layout = QVBoxLayout(self.incr_options_widget)
@@ -588,7 +597,8 @@ class UnpackPage(QWidget):
         
         config = {
             'pak_path': pak_path,
-            'output_path': output_path
+            'output_path': output_path,
+            'selective': self.selective_checkbox.isChecked()
         }
         self.start_pak_decrypt.emit(config)
     
@@ -616,7 +626,8 @@ class UnpackPage(QWidget):
                 'output_path': output_path,
                 'mode': mode,
                 'spine': False,
-                'past_path': None
+                'past_path': None,
+                'vfs': self.vfs_checkbox.isChecked()
             }
         else:
             # 增量模式
@@ -943,6 +954,37 @@ class SettingsPage(QWidget):
         workers_row.addStretch()
         runtime_layout.addLayout(workers_row)
         
+        # PNG 编码进程数 / 压缩等级
+        png_row = QHBoxLayout()
+        png_workers_label = QLabel("PNG编码进程数")
+        png_workers_label.setMinimumWidth(120)
+        self.png_workers_spin = QSpinBox()
+        self.png_workers_spin.setRange(0, 64)
+        self.png_workers_spin.setSpecialValueText("自动")
+        png_level_label = QLabel("PNG压缩等级")
+        self.png_level_spin = QSpinBox()
+        self.png_level_spin.setRange(0, 9)
+        self.png_level_spin.setValue(6)
+        png_row.addWidget(png_workers_label)
+        png_row.addWidget(self.png_workers_spin)
+        png_row.addWidget(png_level_label)
+        png_row.addWidget(self.png_level_spin)
+        png_row.addStretch()
+        runtime_layout.addLayout(png_row)
+        
+        # 贴图输出档位
+        profile_row = QHBoxLayout()
+        profile_label = QLabel("贴图输出档位")
+        profile_label.setMinimumWidth(120)
+        self.profile_combo = QComboBox()
+        self.profile_combo.addItem("归档 PNG（archive）", "archive")
+        self.profile_combo.addItem("快速预览 PNG（fast）", "fast")
+        self.profile_combo.addItem("无损 WebP（webp-lossless）", "webp-lossless")
+        profile_row.addWidget(profile_label)
+        profile_row.addWidget(self.profile_combo)
+        profile_row.addStretch()
+        runtime_layout.addLayout(profile_row)
+        
         # 中文名开关
         self.cn_name_checkbox = QCheckBox("音频文件应用中文名")
         runtime_layout.addWidget(self.cn_name_checkbox)
@@ -1000,6 +1042,9 @@ class SettingsPage(QWidget):
                 selector.set_path(value)
         
         self.workers_spin.setValue(self.cfg.get("max_workers", 2))
+        self.png_workers_spin.setValue(self.cfg.get("png_workers", 0))
+        self.png_level_spin.setValue(self.cfg.get("png_compress_level", 6))
+        self.profile_combo.setCurrentIndex(max(0, self.profile_combo.findData(self.cfg.get("output_profile", "archive"))))
         self.cn_name_checkbox.setChecked(self.cfg.get("UseCNName", False))
     
     def _save_settings(self):
@@ -1010,6 +1055,9 @@ class SettingsPage(QWidget):
                 self.cfg.set(key, value)
         
         self.cfg.set("max_workers", self.workers_spin.value())
+        self.cfg.set("png_workers", self.png_workers_spin.value())
+        self.cfg.set("png_compress_level", self.png_level_spin.value())
+        self.cfg.set("output_profile", self.profile_combo.currentData())
         self.cfg.set("UseCNName", self.cn_name_checkbox.isChecked())
         
         QMessageBox.information(self, "提示", "设置已保存")
@@ -1223,15 +1271,23 @@ class MainWindow(QMainWindow):
             cfg = ConfigManager()
             quickbms_path = str(cfg.get("quickbms_path"))
             
-            # 清理并创建输出目录
-            if path.exists(output_path):
+            from pak_extract import extract_paks
+            
+            # 清理并创建输出目录；按需解包时就地更新已有的输出目录
+            if path.exists(output_path) and not config.get('selective'):
                 import shutil
                 shutil.rmtree(output_path)
-            makedirs(output_path)
+            makedirs(output_path, exist_ok=True)
             
             logger.info(f"PAK路径: {pak_path}")
             logger.info(f"输出路径: {output_path}")
             
+            if config.get('selective'):
+                extract_paks(pak_path, output_path, cfg.get("pak_include"), cfg.get("pak_exclude"),
+                             update=True)
+                logger.success("PAK解密完成")
+                return
+            
             bms_script = path.join(getcwd(), "res", "unreal_tournament_4_0.4.27e_snowbreak.bms")
             cmd = [
                 f'"{quickbms_path}"',
@@ -1276,7 +1332,14 @@ class MainWindow(QMainWindow):
                 logger.info("正在提取全部默认资源...")
                 logger.info(f"输入路径: {ue_path}")
                 logger.info(f"输出路径: {output_path}")
-                CBUNpakMain()
+                if config.get('vfs'):
+                    from pak_vfs import vfs
+                    pak_path = str(cfg.get("pak_path"))
+                    logger.info(f"直接从PAK读取: {pak_path}")
+                    with vfs.mounted(pak_path, ue_path):
+                        CBUNpakMain()
+                else:
+                    CBUNpakMain()
             elif mode == 1:
                 if past_path:
                     cfg.set("past_path", past_path)
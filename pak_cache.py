@@ -0,0 +1,138 @@
+"""
+pak 索引磁盘缓存
+每个 pak 的解析结果单独存成一个紧凑的二进制文件，以 (文件大小, 修改时间, footer 哈希) 作为身份，
+游戏未更新时直接读取缓存；某个 pak 被补丁替换后只会使它自己的缓存失效
+"""
+import hashlib
+import struct
+import zlib
+from os import path, makedirs, stat, replace
+from loguru import logger
+from config_manager import ROOT_DIR
+from pak_reader import PakEntry, PakIndex, PakError, FOOTER_SIZE, read_pak_index
+
+CACHE_DIR = path.join(ROOT_DIR, "cache", "pak_index")
+CACHE_MAGIC = b"CBPI"
+CACHE_VERSION = 1
+
+_HEAD = struct.Struct("<4sHQQ20s")          # magic, 格式版本, 文件大小, mtime_ns, footer sha1
+_INDEX = struct.Struct("<IBII")              # pak 版本, 索引是否加密, 条目数, 忽略条目数
+_ENTRY = struct.Struct("<QQQQ20sBIBI")       # offset zsize size header_offset hash encrypted block_size comp 块数
+_BLOCK = struct.Struct("<QI")                # 块偏移, 块压缩大小
+
+
+def pak_identity(pak_file: str) -> tuple:
+    """pak 身份：文件大小、修改时间、footer 的 sha1"""
+    st = stat(pak_file)
+    with open(pak_file, "rb") as f:
+        f.seek(max(0, st.st_size - FOOTER_SIZE))
+        footer_hash = hashlib.sha1(f.read(FOOTER_SIZE)).digest()
+    return st.st_size, st.st_mtime_ns, footer_hash
+
+
+def _pack_str(s: str) -> bytes:
+    b = s.encode("utf-8")
+    return struct.pack("<H", len(b)) + b
+
+
+def _unpack_str(data, pos: int):
+    (size,) = struct.unpack_from("<H", data, pos)
+    pos += 2
+    return bytes(data[pos:pos + size]).decode("utf-8"), pos + size
+
+
+def dump_index(index: PakIndex, identity: tuple) -> bytes:
+    """把索引序列化为缓存文件内容"""
+    comps = sorted({e.comp for e in index.entries.values()})
+    body = bytearray(_INDEX.pack(index.version, index.encrypted_index, len(index.entries), len(index.skipped)))
+    body += _pack_str(index.mount_point)
+    body += _pack_str("\n".join(index.comp_methods))
+    body += _pack_str("\n".join(comps))
+    for e in index.entries.values():
+        body += _pack_str(e.path)
+        body += _ENTRY.pack(e.offset, e.zsize, e.size, e.header_offset, e.hash, e.encrypted,
+                            e.block_size, comps.index(e.comp), len(e.blocks))
+        for offset, zsize in e.blocks:
+            body += _BLOCK.pack(offset, zsize)
+    for name in index.skipped:
+        body += _pack_str(name)
+    return _HEAD.pack(CACHE_MAGIC, CACHE_VERSION, *identity) + zlib.compress(bytes(body), 1)
+
+
+def load_index(data: bytes, pak_file: str, identity: tuple):
+    """解析缓存文件内容；身份不一致或格式不符时返回 None"""
+    if len(data) < _HEAD.size:
+        return None
+    magic, version, *cached_identity = _HEAD.unpack_from(data)
+    if magic != CACHE_MAGIC or version != CACHE_VERSION or tuple(cached_identity) != tuple(identity):
+        return None
+    body = zlib.decompress(data[_HEAD.size:])
+    pak_version, encrypted_index, count, skipped = _INDEX.unpack_from(body)
+    pos = _INDEX.size
+    mount_point, pos = _unpack_str(body, pos)
+    comp_methods, pos = _unpack_str(body, pos)
+    comps, pos = _unpack_str(body, pos)
+    comps = comps.split("\n")
+    index = PakIndex(pak=pak_file, version=pak_version, mount_point=mount_point,
+                     comp_methods=comp_methods.split("\n"), encrypted_index=bool(encrypted_index))
+    for _ in range(count):
+        name, pos = _unpack_str(body, pos)
+        offset, zsize, size, header_offset, entry_hash, encrypted, block_size, comp, nblocks = \
+            _ENTRY.unpack_from(body, pos)
+        pos += _ENTRY.size
+        blocks = [_BLOCK.unpack_from(body, pos + i * _BLOCK.size) for i in range(nblocks)]
+        pos += nblocks * _BLOCK.size
+        index.add(PakEntry(path=name, pak=pak_file, offset=offset, zsize=zsize, size=size,
+                           comp=comps[comp], hash=entry_hash, encrypted=bool(encrypted),
+                           block_size=block_size, header_offset=header_offset, blocks=blocks))
+    for _ in range(skipped):
+        name, pos = _unpack_str(body, pos)
+        index.skipped.append(name)
+    return index
+
+
+def cache_file(pak_file: str, cache_dir: str = CACHE_DIR) -> str:
+    """缓存文件名带上所在目录的短哈希，新旧版本的同名 pak 互不覆盖"""
+    folder = hashlib.md5(path.dirname(path.abspath(pak_file)).lower().encode("utf-8")).hexdigest()[:8]
+    return path.join(cache_dir, f"{path.basename(pak_file)}.{folder}.idx")
+
+
+def load_pak_index(pak_file: str, cache_dir: str = CACHE_DIR) -> PakIndex:
+    """优先从缓存读取 pak 索引，缓存缺失或失效时重新解析并写回"""
+    identity = pak_identity(pak_file)
+    cached = cache_file(pak_file, cache_dir)
+    if path.isfile(cached):
+        try:
+            with open(cached, "rb") as f:
+                index = load_index(f.read(), pak_file, identity)
+            if index is not None:
+                return index
+            logger.debug(f"[索引缓存] {path.basename(pak_file)} 已变化，重新解析")
+        except (OSError, zlib.error, struct.error, UnicodeDecodeError, IndexError) as e:
+            logger.warning(f"[索引缓存] 读取失败，重新解析 {cached}: {e}")
+
+    index = read_pak_index(pak_file)
+    try:
+        makedirs(cache_dir, exist_ok=True)
+        tmp = cached + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(dump_index(index, identity))
+        replace(tmp, cached)
+    except OSError as e:
+        logger.warning(f"[索引缓存] 写入失败 {cached}: {e}")
+    return index
+
+
+if __name__ == "__main__":
+    import time
+    from config_manager import ConfigManager
+    from pak_reader import list_pak_files
+
+    cfg = ConfigManager()
+    start = time.perf_counter()
+    for pak in list_pak_files(str(cfg.get("pak_path"))):
+        try:
+            load_pak_index(pak)
+        except (PakError, OSError) as e:
+            logger.error(f"[索引缓存] {pak}: {e}")
+    logger.info(f"[索引缓存] 用时 {time.perf_counter() - start:.2f}s")
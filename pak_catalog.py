@@ -0,0 +1,171 @@
+"""
+pak 条目版本目录
+把每个游戏版本的 pak 索引（路径、大小、哈希、所在 pak、压缩方式）录入同一个 SQLite 数据库，
+之后"某个立绘最早出现在哪个版本""某文件在哪个 pak 里""某目录每个版本增长了多少"都直接查库，无需解包
+"""
+import re
+import sqlite3
+import time
+from os import path, makedirs
+from loguru import logger
+from config_manager import ROOT_DIR
+from pak_diff import load_install_index
+
+CATALOG_FILE = path.join(ROOT_DIR, "pak_catalog.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    seq INTEGER NOT NULL DEFAULT 0,
+    pak_dir TEXT,
+    added_at TEXT
+);
+CREATE TABLE IF NOT EXISTS paths (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    dir TEXT NOT NULL COLLATE NOCASE
+);
+CREATE INDEX IF NOT EXISTS paths_dir ON paths(dir);
+CREATE TABLE IF NOT EXISTS paks (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE COLLATE NOCASE
+);
+CREATE TABLE IF NOT EXISTS entries (
+    path_id INTEGER NOT NULL,
+    version_id INTEGER NOT NULL,
+    pak_id INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    zsize INTEGER NOT NULL,
+    hash BLOB NOT NULL,
+    comp TEXT NOT NULL,
+    PRIMARY KEY (path_id, version_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_version ON entries(version_id);
+"""
+
+
+def version_key(name: str) -> tuple:
+    """按版本号中的数字排序：V3.5.0.119-20260129 -> (3, 5, 0, 119, 20260129)"""
+    return tuple(int(n) for n in re.findall(r"\d+", name))
+
+
+def guess_version_name(pak_dir: str) -> str:
+    """从 Paks 目录的上级路径中找形如 V3.5.0.119-20260129 的版本目录名，找不到时用目录名"""
+    parts = path.normpath(path.abspath(pak_dir)).replace("\\", "/").split("/")
+    for part in reversed(parts):
+        if re.fullmatch(r"[Vv]?\d+(?:\.\d+)+(?:[-_]\w+)?", part):
+            return part
+    return parts[-1]
+
+
+def glob_to_like(pattern: str) -> str:
+    """通配符（* ?）转为 LIKE 模式，配合 ESCAPE '\\' 使用"""
+    pattern = pattern.replace("\\", "/")
+    pattern = pattern.replace("%", r"\%").replace("_", r"\_")
+    return pattern.replace("*", "%").replace("?", "_")
+
+
+def open_catalog(db_file: str = CATALOG_FILE) -> sqlite3.Connection:
+    makedirs(path.dirname(path.abspath(db_file)), exist_ok=True)
+    conn = sqlite3.connect(db_file)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _resequence(conn: sqlite3.Connection):
+    """按版本号重新编排 seq，录入顺序与版本先后无关"""
+    names = [row[0] for row in conn.execute("SELECT name FROM versions")]
+    conn.executemany("UPDATE versions SET seq = ? WHERE name = ?",
+                     [(i, name) for i, name in enumerate(sorted(names, key=version_key))])
+
+
+def add_version(conn: sqlite3.Connection, name: str, pak_dir: str) -> int:
+    """录入（或重新录入）一个版本的全部 pak 条目，返回条目数"""
+    start = time.perf_counter()
+    entries = load_install_index(pak_dir)
+    with conn:
+        conn.execute("INSERT OR IGNORE INTO versions (name) VALUES (?)", (name,))
+        conn.execute("UPDATE versions SET pak_dir = ?, added_at = ? WHERE name = ?",
+                     (path.abspath(pak_dir), time.strftime("%Y-%m-%d %H:%M:%S"), name))
+        (version_id,) = conn.execute("SELECT id FROM versions WHERE name = ?", (name,)).fetchone()
+        conn.execute("DELETE FROM entries WHERE version_id = ?", (version_id,))
+
+        conn.executemany("INSERT OR IGNORE INTO paths (path, dir) VALUES (?, ?)",
+                         [(p, p.rpartition("/")[0]) for p in entries])
+        conn.executemany("INSERT OR IGNORE INTO paks (name) VALUES (?)",
+                         [(n,) for n in {path.basename(e.pak) for e in entries.values()}])
+        path_ids = {p.lower(): i for i, p in conn.execute("SELECT id, path FROM paths")}
+        pak_ids = {n.lower(): i for i, n in conn.execute("SELECT id, name FROM paks")}
+        conn.executemany(
+            "INSERT INTO entries (path_id, version_id, pak_id, size, zsize, hash, comp) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(path_ids[p.lower()], version_id, pak_ids[path.basename(e.pak).lower()],
+              e.size, e.zsize, e.hash, e.comp) for p, e in entries.items()])
+        _resequence(conn)
+    logger.success(f"[版本目录] 已录入 {name}：{len(entries)} 个条目，用时 {time.perf_counter() - start:.1f}s")
+    return len(entries)
+
+
+def remove_version(conn: sqlite3.Connection, name: str):
+    with conn:
+        conn.execute("DELETE FROM entries WHERE version_id IN (SELECT id FROM versions WHERE name = ?)", (name,))
+        conn.execute("DELETE FROM versions WHERE name = ?", (name,))
+        _resequence(conn)
+
+
+def list_versions(conn: sqlite3.Connection) -> list:
+    """[(版本名, 条目数, 总大小)]，按版本先后排列"""
+    return conn.execute(
+        "SELECT v.name, COUNT(e.path_id), COALESCE(SUM(e.size), 0) FROM versions v "
+        "LEFT JOIN entries e ON e.version_id = v.id GROUP BY v.id ORDER BY v.seq").fetchall()
+
+
+def first_seen(conn: sqlite3.Connection, pattern: str) -> list:
+    """匹配通配符的条目最早出现的版本：[(路径, 版本名)]"""
+    return [row[:2] for row in conn.execute(
+        "SELECT p.path, v.name, MIN(v.seq) FROM paths p "
+        "JOIN entries e ON e.path_id = p.id JOIN versions v ON v.id = e.version_id "
+        "WHERE p.path LIKE ? ESCAPE '\\' GROUP BY p.id ORDER BY p.path", (glob_to_like(pattern),))]
+
+
+def last_changed(conn: sqlite3.Connection, pattern: str) -> list:
+    """匹配通配符的条目最后一次新增或内容变化的版本：[(路径, 版本名)]"""
+    return [row[:2] for row in conn.execute(
+        "WITH h AS ("
+        "  SELECT e.path_id, e.hash, v.name, v.seq,"
+        "         LAG(e.hash) OVER (PARTITION BY e.path_id ORDER BY v.seq) AS prev"
+        "  FROM entries e JOIN versions v ON v.id = e.version_id"
+        "  WHERE e.path_id IN (SELECT id FROM paths WHERE path LIKE ? ESCAPE '\\')"
+        ") "
+        "SELECT p.path, h.name, MAX(h.seq) FROM h JOIN paths p ON p.id = h.path_id "
+        "WHERE h.prev IS NULL OR h.prev != h.hash GROUP BY h.path_id ORDER BY p.path",
+        (glob_to_like(pattern),))]
+
+
+def which_pak(conn: sqlite3.Connection, pattern: str, version: str = None) -> list:
+    """匹配通配符的条目所在的 pak（默认最新版本）：[(路径, 版本名, pak, 大小, 压缩方式)]"""
+    if version is None:
+        row = conn.execute("SELECT name FROM versions ORDER BY seq DESC LIMIT 1").fetchone()
+        if row is None:
+            return []
+        version = row[0]
+    return conn.execute(
+        "SELECT p.path, v.name, k.name, e.size, e.comp FROM paths p "
+        "JOIN entries e ON e.path_id = p.id JOIN versions v ON v.id = e.version_id "
+        "JOIN paks k ON k.id = e.pak_id "
+        "WHERE v.name = ? AND p.path LIKE ? ESCAPE '\\' ORDER BY p.path",
+        (version, glob_to_like(pattern))).fetchall()
+
+
+def dir_growth(conn: sqlite3.Connection, directory: str) -> list:
+    """目录（含子目录）在各版本中的文件数与总大小：[(版本名, 文件数, 总大小)]"""
+    directory = directory.replace("\\", "/").strip("/")
+    return conn.execute(
+        "SELECT v.name, COUNT(e.path_id), COALESCE(SUM(e.size), 0) FROM versions v "
+        "LEFT JOIN entries e ON e.version_id = v.id AND e.path_id IN ("
+        "  SELECT id FROM paths WHERE dir = ? OR dir LIKE ? ESCAPE '\\') "
+        "GROUP BY v.id ORDER BY v.seq",
+        (directory, glob_to_like(directory) + "/%")).fetchall()
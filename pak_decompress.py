@@ -0,0 +1,170 @@
+"""
+pak 条目分块并行解压
+大文件（CG 背景、Wwise 音频库）在 pak 中被切成多个 64 KB 压缩块，
+这里用线程池并发解密/解压各块（zlib / zstd 解压时会释放 GIL），直接写入预分配的输出缓冲区
+"""
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from loguru import logger
+from pak_crypto import decrypt_span, align16, DECRYPT_BATCH
+from pak_reader import PakEntry, PakError
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.block as lz4_block
+except ImportError:
+    lz4_block = None
+
+# 块数少于该值的条目直接在当前线程解压，避免线程调度开销
+PARALLEL_MIN_BLOCKS = 8
+
+
+def missing_codec(method: str) -> str:
+    """压缩方式在当前环境下无法解压时返回原因，可以解压（或未压缩）时返回空串"""
+    if not method or method in ("zlib", "gzip"):
+        return ""
+    if method == "zstd":
+        return "" if zstandard is not None else "未安装 zstandard"
+    if method == "lz4":
+        return "" if lz4_block is not None else "未安装 lz4"
+    if method == "oodle":
+        return "Oodle 为专有压缩库，原生解包不支持"
+    return "不支持的压缩方式"
+
+
+def decompress_block(method: str, data, size: int) -> bytes:
+    """解压单个压缩块"""
+    if method == "zlib":
+        return zlib.decompress(data)
+    if method == "gzip":
+        return zlib.decompress(data, 31)
+    if method == "zstd":
+        if zstandard is None:
+            raise PakError("未安装 zstandard，无法解压 zstd 条目")
+        return zstandard.ZstdDecompressor().decompress(data, max_output_size=size)
+    if method == "lz4":
+        if lz4_block is None:
+            raise PakError("未安装 lz4，无法解压 lz4 条目")
+        return lz4_block.decompress(data, uncompressed_size=size)
+    raise PakError(f"不支持的压缩方式: {method}")
+
+
+class BlockDecompressor:
+    """按块并行读取 pak 条目，并按压缩方式统计吞吐"""
+
+    def __init__(self, threads: int = 4):
+        self.threads = max(1, threads)
+        self._executor = ThreadPoolExecutor(max_workers=self.threads) if self.threads > 1 else None
+        self._lock = threading.Lock()
+        self.stats = {}  # 压缩方式 -> [输出字节数, 耗时秒]
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _record(self, method: str, size: int, elapsed: float):
+        with self._lock:
+            item = self.stats.setdefault(method or "none", [0, 0.0])
+            item[0] += size
+            item[1] += elapsed
+
+    def read(self, mm, entry: PakEntry, key: bytes) -> bytearray:
+        """读取条目原始内容（解密 + 解压）"""
+        start = time.perf_counter()
+        if not entry.blocks:
+            # 没有块表：整个数据区为一段；压缩条目按单块解压，不能把压缩数据原样当作内容写出
+            if entry.encrypted:
+                out = decrypt_span(key, mm, entry.offset, entry.zsize, bytearray(align16(entry.zsize)))
+                del out[entry.zsize:]
+            else:
+                out = bytearray(mm[entry.offset:entry.offset + entry.zsize])
+            if entry.comp:
+                out = bytearray(decompress_block(entry.comp, out, entry.size))
+            else:
+                del out[entry.size:]
+            if len(out) != entry.size:
+                raise PakError(f"条目大小不符: {len(out)} != {entry.size}")
+            self._record(entry.comp, entry.size, time.perf_counter() - start)
+            return out
+
+        out = bytearray(entry.size)
+        view = memoryview(out)
+
+        def _inflate(batch: range):
+            # 加密条目的一批连续块合并为一次 ECB 调用解密，再逐块解压
+            first = entry.blocks[batch[0]][0]
+            plain = None
+            if entry.encrypted:
+                last_offset, last_zsize = entry.blocks[batch[-1]]
+                plain = decrypt_span(key, mm, first, last_offset + align16(last_zsize) - first)
+            for i in batch:
+                offset, zsize = entry.blocks[i]
+                if plain is not None:
+                    data = plain[offset - first:offset - first + zsize]
+                else:
+                    data = mm[offset:offset + zsize]
+                begin = i * entry.block_size
+                size = min(entry.block_size, entry.size - begin)
+                block = decompress_block(entry.comp, data, size)
+                if len(block) != size:
+                    raise PakError(f"块 {i} 解压大小不符: {len(block)} != {size}")
+                view[begin:begin + size] = block
+
+        batches = _batches(entry)
+        if self._executor is None or len(entry.blocks) < PARALLEL_MIN_BLOCKS:
+            for batch in batches:
+                _inflate(batch)
+        else:
+            # list() 触发所有结果，任一批出错时抛出异常
+            list(self._executor.map(_inflate, batches))
+        view.release()
+        self._record(entry.comp, entry.size, time.perf_counter() - start)
+        return out
+
+
+def _batches(entry: PakEntry) -> list:
+    """
+    把块序号切成若干批：加密条目每批为 pak 中连续、合计（压缩或解压后）约 DECRYPT_BATCH 字节的块，
+    不连续处（理论上不会出现）另起一批；未加密条目每块一批
+    """
+    if not entry.encrypted:
+        return [range(i, i + 1) for i in range(len(entry.blocks))]
+    batches, begin, size = [], 0, 0
+    for i, (offset, zsize) in enumerate(entry.blocks):
+        if i > begin:
+            prev_offset, prev_zsize = entry.blocks[i - 1]
+            # 压缩率高时按解压后大小截断，保证大条目仍能拆成多批并行解压
+            full = size >= DECRYPT_BATCH or (i - begin) * entry.block_size >= DECRYPT_BATCH
+            if full or offset != prev_offset + align16(prev_zsize):
+                batches.append(range(begin, i))
+                begin, size = i, 0
+        size += align16(zsize)
+    batches.append(range(begin, len(entry.blocks)))
+    return batches
+
+
+def merge_stats(total: dict, stats: dict):
+    for method, (size, elapsed) in stats.items():
+        item = total.setdefault(method, [0, 0.0])
+        item[0] += size
+        item[1] += elapsed
+
+
+def log_stats(stats: dict):
+    """输出各压缩方式的解压吞吐 (MB/s)"""
+    for method, (size, elapsed) in sorted(stats.items()):
+        mb = size / 1024 ** 2
+        speed = mb / elapsed if elapsed > 0 else 0.0
+        logger.info(f"[解压统计] {method}: {mb:.1f} MB, {elapsed:.2f}s, {speed:.1f} MB/s")
@@ -0,0 +1,55 @@
+"""
+版本差异对比
+直接比较新旧两个游戏目录的 pak 索引（路径 + 条目 SHA1），无需解包任何一个版本
+"""
+import struct
+from os import path, makedirs
+from loguru import logger
+from pak_cache import load_pak_index
+from pak_reader import PakError, list_pak_files
+
+
+def load_install_index(pak_dir: str) -> dict:
+    """
+    合并目录下全部 pak 的索引：路径 -> PakEntry
+    pak 按文件名排序读取，补丁包（*_P.pak）排在原包之后，同名条目以后读到的为准
+    """
+    entries = {}
+    for pak_file in list_pak_files(pak_dir):
+        try:
+            entries.update(load_pak_index(pak_file).entries)
+        except (PakError, OSError, ValueError, struct.error) as e:
+            logger.error(f"[差异对比] 索引读取失败 {pak_file}: {e}")
+    return entries
+
+
+def diff_indexes(old: dict, new: dict) -> dict:
+    """按路径与哈希比较两份索引，返回新增 / 删除 / 修改的路径列表"""
+    old_paths, new_paths = set(old), set(new)
+    modified = [p for p in old_paths & new_paths
+                if old[p].hash != new[p].hash or old[p].size != new[p].size]
+    return {
+        "added": sorted(new_paths - old_paths),
+        "removed": sorted(old_paths - new_paths),
+        "modified": sorted(modified),
+    }
+
+
+def diff_installs(old_pak_dir: str, new_pak_dir: str) -> dict:
+    """对比新旧两个版本的 Paks 目录"""
+    logger.info(f"[差异对比] 旧版本: {old_pak_dir}")
+    logger.info(f"[差异对比] 新版本: {new_pak_dir}")
+    result = diff_indexes(load_install_index(old_pak_dir), load_install_index(new_pak_dir))
+    logger.success(f"[差异对比] 新增 {len(result['added'])}，删除 {len(result['removed'])}，"
+                   f"修改 {len(result['modified'])}")
+    return result
+
+
+def write_diff_report(result: dict, out_file: str):
+    """写出差异清单：每行 "标记<TAB>路径"，+ 新增 / - 删除 / * 修改"""
+    makedirs(path.dirname(path.abspath(out_file)), exist_ok=True)
+    with open(out_file, "w", encoding="utf-8") as f:
+        for mark, key in (("+", "added"), ("-", "removed"), ("*", "modified")):
+            for p in result[key]:
+                f.write(f"{mark}\t{p}\n")
+    logger.success(f"[✔] 已生成差异清单: {out_file}")
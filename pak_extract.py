@@ -0,0 +1,376 @@
+"""
+pak 原生解包
+基于 pak_reader 的索引直接解密/解压条目，支持 include/exclude 通配符只写出需要的文件
+"""
+import fnmatch
+import hashlib
+import mmap
+import os
+import re
+import struct
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from os import path, makedirs, listdir, getpid, remove, rmdir, replace
+from loguru import logger
+from config_manager import ConfigManager
+from pak_crypto import derive_pak_key
+from pak_decompress import BlockDecompressor, missing_codec, merge_stats, log_stats
+from pak_cache import load_pak_index
+from pak_reader import PakError, list_pak_files
+
+# 大 pak 按约 512 MB 原始数据拆分成多个进程任务
+SHARD_BYTES = 512 * 1024 ** 2
+# 每个进程内用于分块解压的线程数
+DECOMPRESS_THREADS = 4
+# 断点续传日志目录（位于输出目录下）
+JOURNAL_DIR = ".cbunpak_journal"
+# 无法使用 copy_file_range / sendfile 时，直接复制条目每次写出的字节数
+COPY_CHUNK = 8 * 1024 ** 2
+# 每追加多少行日志 fsync 一次日志文件（条目文件本身在记录前逐个 fsync）
+JOURNAL_SYNC_EVERY = 64
+
+
+def compile_globs(patterns):
+    """把通配符列表合并成一个忽略大小写的正则，空列表返回 None"""
+    patterns = [p.replace("\\", "/").strip("/") for p in patterns or [] if p]
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(p) for p in patterns), re.IGNORECASE)
+
+
+def make_filter(include=None, exclude=None):
+    """生成条目路径过滤函数；include 为空表示全部包含"""
+    inc = compile_globs(include)
+    exc = compile_globs(exclude)
+
+    def _match(entry_path: str) -> bool:
+        if inc is not None and not inc.match(entry_path):
+            return False
+        return exc is None or not exc.match(entry_path)
+
+    return _match
+
+
+def entry_out_path(out_dir: str, entry_path: str) -> str:
+    return path.join(out_dir, *entry_path.split("/"))
+
+
+def load_journal(out_dir: str) -> dict:
+    """
+    读取断点续传日志：路径 -> (条目哈希, 大小)
+    每个进程写自己的日志文件，每行 "哈希<TAB>大小<TAB>路径"，中断时写了一半的末行会被忽略
+    """
+    journal_dir = path.join(out_dir, JOURNAL_DIR)
+    done = {}
+    if not path.isdir(journal_dir):
+        return done
+    for name in listdir(journal_dir):
+        if not name.endswith(".log"):
+            continue
+        with open(path.join(journal_dir, name), "r", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    continue
+                parts = line.rstrip("\n").split("\t", 2)
+                if len(parts) == 3 and parts[1].isdigit():
+                    done[parts[2]] = (parts[0], int(parts[1]))
+    return done
+
+
+def _is_done(out_dir: str, entry, done: dict) -> bool:
+    """日志中记录的哈希、大小与当前条目一致，且磁盘上的文件大小完整"""
+    if done.get(entry.path) != (entry.hash.hex(), entry.size):
+        return False
+    out_file = entry_out_path(out_dir, entry.path)
+    return path.isfile(out_file) and path.getsize(out_file) == entry.size
+
+
+def _same_content(out_file: str, data) -> bool:
+    """磁盘上已有文件与条目内容一致：先比大小，大小相同再比哈希（分块读取，不把整个文件读进内存）"""
+    if not path.isfile(out_file) or path.getsize(out_file) != len(data):
+        return False
+    h = hashlib.blake2b(digest_size=20)
+    with open(out_file, "rb") as f:
+        while chunk := f.read(COPY_CHUNK):
+            h.update(chunk)
+    return h.digest() == hashlib.blake2b(data, digest_size=20).digest()
+
+
+def is_stored(entry) -> bool:
+    """未压缩、未加密的条目（如 Wwise 的 .wem），数据在 pak 中连续存放，可按偏移直接复制"""
+    return not entry.comp and not entry.encrypted and not entry.blocks
+
+
+def copy_stored(src_fd: int, mm, offset: int, size: int, out_file: str):
+    """
+    把 pak 中 [offset, offset + size) 直接复制到 out_file，不经过用户态缓冲：
+    优先 os.copy_file_range，其次 os.sendfile，两者都不可用（Windows）时从 mmap 分块写出
+    返回前 fsync，确保之后记录日志时文件内容已经落盘
+    """
+    if offset + size > len(mm):
+        raise PakError(f"条目数据超出 pak 文件末尾: {offset} + {size}")
+    done = 0
+    with open(out_file, "wb", buffering=0) as out:
+        dst_fd = out.fileno()
+        if hasattr(os, "copy_file_range"):
+            try:
+                while done < size:
+                    n = os.copy_file_range(src_fd, dst_fd, size - done, offset + done)
+                    if n == 0:
+                        break
+                    done += n
+            except OSError:
+                pass  # 跨文件系统或内核不支持时改用 sendfile
+        if done < size and hasattr(os, "sendfile"):
+            try:
+                while done < size:
+                    n = os.sendfile(dst_fd, src_fd, offset + done, size - done)
+                    if n == 0:
+                        break
+                    done += n
+            except OSError:
+                pass
+        if done < size:
+            out.seek(done)
+            with memoryview(mm) as view:
+                while done < size:
+                    end = min(size, done + COPY_CHUNK)
+                    with view[offset + done:offset + end] as chunk:
+                        out.write(chunk)
+                    done = end
+        os.fsync(dst_fd)
+
+
+def _extract_entries(pak_file: str, out_dir: str, entries: list, update: bool = False) -> dict:
+    """
+    进程池任务：写出同一个 pak 中的一组条目，每写完一个就追加一行日志
+    update 为真时先与磁盘上的同名文件比较，内容一致则只补记日志不重写
+    """
+    summary = {"files": 0, "bytes": 0, "unchanged": 0, "failed": [], "comp_stats": {}}
+    stored = [0, 0.0]  # 直接复制的字节数、耗时
+    pending = 0  # 尚未 fsync 的日志行数
+    key = derive_pak_key(pak_file)
+    journal_dir = path.join(out_dir, JOURNAL_DIR)
+    makedirs(journal_dir, exist_ok=True)
+    with open(pak_file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+            BlockDecompressor(DECOMPRESS_THREADS) as decompressor, \
+            open(path.join(journal_dir, f"{getpid()}.log"), "a", encoding="utf-8") as journal:
+        if journal.tell():
+            journal.write("\n")  # 与上次可能中断在半行的记录隔开
+        for entry in entries:
+            out_file = entry_out_path(out_dir, entry.path)
+            try:
+                if is_stored(entry):
+                    start = time.perf_counter()
+                    with memoryview(mm) as view, view[entry.offset:entry.offset + entry.size] as data:
+                        unchanged = update and _same_content(out_file, data)
+                    if not unchanged:
+                        makedirs(path.dirname(out_file), exist_ok=True)
+                        copy_stored(f.fileno(), mm, entry.offset, entry.size, out_file)
+                    stored[0] += entry.size
+                    stored[1] += time.perf_counter() - start
+                else:
+                    data = decompressor.read(mm, entry, key)
+                    unchanged = update and _same_content(out_file, data)
+                    if not unchanged:
+                        makedirs(path.dirname(out_file), exist_ok=True)
+                        with open(out_file, "wb") as out:
+                            out.write(data)
+                            out.flush()
+                            os.fsync(out.fileno())
+            except (PakError, OSError, zlib.error) as e:
+                logger.error(f"[解包失败] {entry.path}: {e}")
+                summary["failed"].append(entry.path)
+                continue
+            # 文件写完并 fsync 后才记录，未记录的文件下次会重新写出；
+            # 日志本身分批 fsync，断电时最多丢掉最后一批记录，对应的文件下次重写
+            journal.write(f"{entry.hash.hex()}\t{entry.size}\t{entry.path}\n")
+            journal.flush()
+            pending += 1
+            if pending >= JOURNAL_SYNC_EVERY:
+                os.fsync(journal.fileno())
+                pending = 0
+            if unchanged:
+                summary["unchanged"] += 1
+                continue
+            summary["files"] += 1
+            summary["bytes"] += entry.size
+        os.fsync(journal.fileno())
+        summary["comp_stats"] = dict(decompressor.stats)
+        if stored[0]:
+            summary["comp_stats"]["stored"] = stored
+    return summary
+
+
+def plan_shards(pak_files: list, include=None, exclude=None, shard_bytes: int = SHARD_BYTES, only=None,
+                out_dir: str = None):
+    """
+    读取索引（优先使用磁盘缓存）并按过滤规则挑选条目，生成进程池任务：
+    小 pak 整包一个任务，大 pak 按条目区间拆成多个约 shard_bytes 的任务
+    only 不为空时只保留其中列出的条目路径（如版本差异对比得到的新增/修改条目）
+    给出 out_dir 时按断点续传日志跳过已完整写出（且与当前条目哈希一致）的条目
+    返回 dict：shards 任务列表 [(pak, [PakEntry])]、skipped 过滤掉的条目数、failed 索引失败的 pak、
+    resumed 日志中已完成的条目数、overridden 被后面的 pak 覆盖的条目数、paths 全部 pak 中出现过的条目路径、
+    journaled 本次解包前日志中已记录的条目路径、unsupported 无法解压的条目 {压缩方式: [路径]}
+    """
+    match = make_filter(include, exclude)
+    done = load_journal(out_dir) if out_dir else {}
+    plan = {"shards": [], "skipped": 0, "failed": [], "resumed": 0, "overridden": 0, "paths": set(),
+            "journaled": set(done), "unsupported": {}}
+    indexes = []
+    for pak_file in pak_files:
+        try:
+            indexes.append((pak_file, load_pak_index(pak_file)))
+        except (PakError, OSError, ValueError, struct.error) as e:
+            logger.error(f"[解包失败] {pak_file}: {e}")
+            plan["failed"].append(pak_file)
+    # 同一路径出现在多个 pak（原包与 *_P.pak 补丁）时只写出排序最后的那份，
+    # 与 pak_diff.load_install_index / PakFS 的覆盖规则一致，也避免多个进程同时写同一个文件
+    owner = {}
+    for pak_file, index in indexes:
+        for entry_path in index.entries:
+            owner[entry_path.lower()] = pak_file
+    for pak_file, index in indexes:
+        plan["paths"].update(index.entries)
+        current, current_bytes = [], 0
+        for entry in sorted(index.entries.values(), key=lambda e: e.offset):
+            if owner[entry.path.lower()] != pak_file:
+                plan["overridden"] += 1
+                continue
+            if not match(entry.path) or (only is not None and entry.path not in only):
+                plan["skipped"] += 1
+                continue
+            if done and _is_done(out_dir, entry, done):
+                plan["resumed"] += 1
+                continue
+            if missing_codec(entry.comp):
+                # 不交给进程池逐个报错，由 extract_paks 按压缩方式汇总报告
+                plan["unsupported"].setdefault(entry.comp, []).append(entry.path)
+                continue
+            current.append(entry)
+            current_bytes += entry.size
+            if current_bytes >= shard_bytes:
+                plan["shards"].append((pak_file, current))
+                current, current_bytes = [], 0
+        if current:
+            plan["shards"].append((pak_file, current))
+    return plan
+
+
+def remove_stale(out_dir: str, journaled: set, paths: set) -> int:
+    """
+    删除上次解包日志中记录过、但已不在任何 pak 中的文件，并清理因此变空的目录，返回删除的文件数
+    只处理日志里的路径：输出目录中不是本工具解包写出的文件（转换结果、用户文件等）一律不动
+    """
+    removed = 0
+    root = path.normpath(out_dir)
+    keep = {p.lower() for p in paths}
+    for entry_path in journaled:
+        if entry_path.lower() in keep:
+            continue
+        out_file = path.normpath(entry_out_path(out_dir, entry_path))
+        if not out_file.startswith(root + path.sep):
+            continue
+        if path.isfile(out_file):
+            remove(out_file)
+            removed += 1
+        parent = path.dirname(out_file)
+        while parent.startswith(root + path.sep) and path.isdir(parent) and not listdir(parent):
+            rmdir(parent)
+            parent = path.dirname(parent)
+    return removed
+
+
+def compact_journal(out_dir: str, paths: set):
+    """把各进程的日志合并为一个文件，并去掉已删除条目的记录"""
+    journal_dir = path.join(out_dir, JOURNAL_DIR)
+    done = load_journal(out_dir)
+    tmp = path.join(journal_dir, "journal.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        for p, (entry_hash, size) in done.items():
+            if p in paths:
+                f.write(f"{entry_hash}\t{size}\t{p}\n")
+        f.flush()
+        os.fsync(f.fileno())
+    for name in listdir(journal_dir):
+        if name.endswith(".log"):
+            remove(path.join(journal_dir, name))
+    replace(tmp, path.join(journal_dir, "0.log"))
+
+
+def log_summary(summary: dict, elapsed: float):
+    mb = summary["bytes"] / 1024 ** 2
+    logger.success(f"[解包完成] {summary['paks']} 个 pak，写出 {summary['files']} 个文件 "
+                   f"({mb:.1f} MB)，跳过 {summary['skipped']} 个，用时 {elapsed:.1f}s")
+    log_stats(summary["comp_stats"])
+    if summary["failed"]:
+        logger.error(f"[解包失败] 共 {len(summary['failed'])} 个条目未能写出")
+
+
+def extract_paks(pak_dir: str, out_dir: str, include=None, exclude=None, max_workers: int = None,
+                 only=None, update: bool = False) -> dict:
+    """
+    解包目录下全部 pak
+    按 pak / 条目区间分片后交给进程池并行解密解压，各进程独立写文件，最后汇总统计
+    已写出的条目记录在 out_dir/.cbunpak_journal 中，中断后再次运行会从未完成的条目继续
+    update 为真时就地更新已有的输出目录：内容未变的文件不重写，并删除上次解包写出、现已从 pak 中移除的文件
+    max_workers 为空时读取配置中的 max_workers
+    """
+    if max_workers is None:
+        max_workers = ConfigManager().get("max_workers") or 1
+    start = time.perf_counter()
+    pak_files = list_pak_files(pak_dir)
+    plan = plan_shards(pak_files, include, exclude, only=only, out_dir=out_dir)
+    shards = plan["shards"]
+    total = {"paks": len(pak_files) - len(plan["failed"]), "files": 0, "bytes": 0, "unchanged": 0,
+             "skipped": plan["skipped"], "failed": list(plan["failed"]), "resumed": plan["resumed"],
+             "deleted": 0, "comp_stats": {}}
+    if plan["resumed"]:
+        logger.info(f"[断点续传] {plan['resumed']} 个条目已完整写出，跳过")
+    if plan["overridden"]:
+        logger.info(f"[补丁覆盖] {plan['overridden']} 个条目以补丁包中的版本为准")
+    for method, paths in plan["unsupported"].items():
+        logger.error(f"[解包失败] {len(paths)} 个 {method} 压缩的条目无法解压（{missing_codec(method)}），"
+                     f"如 {paths[0]}")
+        total["failed"].extend(paths)
+    logger.info(f"[解包] {len(pak_files)} 个 pak 拆分为 {len(shards)} 个任务，进程数 {max_workers}")
+
+    def _merge(result: dict):
+        for k in ("files", "bytes", "unchanged", "failed"):
+            total[k] += result[k]
+        merge_stats(total["comp_stats"], result["comp_stats"])
+
+    if max_workers <= 1 or len(shards) <= 1:
+        for pak_file, entries in shards:
+            _merge(_extract_entries(pak_file, out_dir, entries, update))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(_extract_entries, pak_file, out_dir, entries, update): pak_file
+                for pak_file, entries in shards
+            }
+            for future in as_completed(futures):
+                try:
+                    _merge(future.result())
+                except Exception as e:
+                    logger.error(f"[解包失败] {path.basename(futures[future])} 子进程异常: {e}")
+                    total["failed"].append(futures[future])
+
+    # 只删除上次日志记录过的文件；有 pak 索引读取失败时不删除，避免把读不出的 pak 中的条目当成已移除
+    if update and not plan["failed"]:
+        total["deleted"] = remove_stale(out_dir, plan["journaled"], plan["paths"])
+        compact_journal(out_dir, plan["paths"])
+        logger.info(f"[就地更新] 内容未变 {total['unchanged'] + total['resumed']} 个，"
+                    f"删除已移除的文件 {total['deleted']} 个")
+
+    log_summary(total, time.perf_counter() - start)
+    return total
+
+
+if __name__ == "__main__":
+    from config_manager import ConfigManager
+
+    cfg = ConfigManager()
+    extract_paks(str(cfg.get("pak_path")), str(cfg.get("unpack_path")),
+                 cfg.get("pak_include"), cfg.get("pak_exclude"))
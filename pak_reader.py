@@ -0,0 +1,291 @@
+"""
+UE4.27 (Snowbreak) pak 索引读取
+直接解析 pak 尾部与加密索引，无需调用 quickbms 即可列出 pak 内全部文件
+
+对应 res/unreal_tournament_4_0.4.27e_snowbreak.bms 的解析流程：
+  goto -0xcc 读取 footer → OFFSET ^ 0x1C1D1E1F → AES 解密索引
+  → 完整目录索引 (FDI) → 编码条目 (OFFSET ^ 0x1F1E1D1C) → 数据区内的条目头
+"""
+import mmap
+import struct
+import time
+from dataclasses import dataclass, field
+from os import path, listdir
+from loguru import logger
+from pak_crypto import derive_pak_key, decrypt_span, align16
+
+PAK_MAGIC = 0x5A6F12E1
+FOOTER_SIZE = 0xCC
+INDEX_OFFSET_XOR = 0x1C1D1E1F
+ENTRY_OFFSET_XOR = 0x1F1E1D1C
+INVALID_ENTRY = (0x80000000, 0x7FFFFFFF)
+COMP_NAME_SIZE = 32
+COMP_NAME_COUNT = 5
+
+
+class PakError(Exception):
+    """pak 文件结构异常"""
+
+
+@dataclass(slots=True)
+class PakEntry:
+    """pak 内单个文件条目"""
+    path: str              # 相对路径（/ 分隔），如 Game/Content/UI/xxx.uexp
+    pak: str               # 所在 pak 文件路径
+    offset: int            # 数据起始偏移（条目头之后）
+    zsize: int             # 压缩后大小
+    size: int              # 原始大小
+    comp: str              # 压缩方式，空串表示未压缩
+    hash: bytes            # 条目头中的 20 字节 SHA1
+    encrypted: bool
+    block_size: int
+    header_offset: int     # 条目头在 pak 中的偏移
+    blocks: list = field(default_factory=list)  # [(绝对偏移, 压缩大小)]
+
+    @property
+    def stored_size(self) -> int:
+        """数据区实际占用的字节数（含加密对齐）"""
+        if self.blocks:
+            return sum(align16(z) if self.encrypted else z for _, z in self.blocks)
+        return align16(self.zsize) if self.encrypted else self.zsize
+
+
+@dataclass
+class PakIndex:
+    """单个 pak 的索引：平铺条目 + 目录树"""
+    pak: str
+    version: int
+    mount_point: str
+    comp_methods: list
+    encrypted_index: bool
+    entries: dict = field(default_factory=dict)      # path -> PakEntry
+    directories: dict = field(default_factory=dict)  # 目录 -> {文件名: PakEntry}
+    subdirs: dict = field(default_factory=dict)      # 目录 -> {子目录名}
+    skipped: list = field(default_factory=list)      # 索引中被忽略的条目
+
+    def add(self, entry: PakEntry):
+        self.entries[entry.path] = entry
+        parent, _, name = entry.path.rpartition("/")
+        self.directories.setdefault(parent, {})[name] = entry
+        # 补齐上级目录，保证目录树可以逐级遍历
+        while parent:
+            grand, _, child = parent.rpartition("/")
+            self.subdirs.setdefault(grand, set()).add(child)
+            if grand in self.directories:
+                break
+            self.directories[grand] = {}
+            parent = grand
+
+    def listdir(self, directory: str = "") -> list:
+        """列出目录下的文件与子目录名"""
+        directory = directory.strip("/")
+        if directory not in self.directories:
+            raise FileNotFoundError(directory)
+        return sorted(set(self.directories[directory]) | self.subdirs.get(directory, set()))
+
+    def walk(self, top: str = ""):
+        """按 os.walk 的形式遍历：(目录, 子目录列表, 文件列表)"""
+        top = top.strip("/")
+        if top not in self.directories:
+            return
+        dirs = sorted(self.subdirs.get(top, ()))
+        yield top, dirs, sorted(self.directories[top])
+        for d in dirs:
+            yield from self.walk(f"{top}/{d}" if top else d)
+
+    @property
+    def total_size(self) -> int:
+        return sum(e.size for e in self.entries.values())
+
+
+class _Reader:
+    """小端二进制游标"""
+
+    def __init__(self, data, pos: int = 0):
+        self.data = data
+        self.pos = pos
+
+    def unpack(self, fmt: str):
+        values = struct.unpack_from(fmt, self.data, self.pos)
+        self.pos += struct.calcsize(fmt)
+        return values if len(values) > 1 else values[0]
+
+    def read(self, size: int) -> bytes:
+        chunk = bytes(self.data[self.pos:self.pos + size])
+        self.pos += size
+        return chunk
+
+    def fstring(self) -> str:
+        """UE FString：int32 长度，负数表示 UTF-16"""
+        size = self.unpack("<i")
+        if size == 0:
+            return ""
+        if size < 0:
+            return self.read(-size * 2).decode("utf-16-le").rstrip("\0")
+        return self.read(size).decode("utf-8", errors="replace").rstrip("\0")
+
+
+def _comp_name(comp_methods: list, zip_index: int) -> str:
+    """条目压缩序号 → 压缩方式名称（对应 bms 中的 COMPRESSION_TYPE）"""
+    if zip_index == 0:
+        return ""
+    if zip_index in (3, 4, 0x10):
+        return "oodle"
+    if zip_index <= len(comp_methods) and comp_methods[zip_index - 1]:
+        return comp_methods[zip_index - 1]
+    return "zlib"
+
+
+def _read_footer(mm) -> dict:
+    file_size = len(mm)
+    magic_off = file_size - FOOTER_SIZE
+    if magic_off <= 0:
+        raise PakError("文件过小，不是有效的 pak")
+    r = _Reader(mm, magic_off)
+    magic, version, offset, _size = r.unpack("<IIQQ")
+    if magic != PAK_MAGIC:
+        raise PakError(f"pak 魔数不匹配: {magic:#x}")
+    footer_hash = r.read(20)
+    offset ^= INDEX_OFFSET_XOR
+    comp_methods = []
+    if r.pos < file_size:
+        if mm[r.pos] <= 1:  # 旧版本的 frozen index 标记
+            r.pos += 1
+        for _ in range(COMP_NAME_COUNT):
+            if r.pos + COMP_NAME_SIZE > file_size:
+                break
+            name = r.read(COMP_NAME_SIZE).split(b"\0", 1)[0].decode("ascii", errors="ignore")
+            comp_methods.append(name.lower())
+    return {
+        "version": version,
+        "offset": offset,
+        "size": magic_off - offset - 1,
+        "hash": footer_hash,
+        "encrypted": mm[magic_off - 1] != 0,
+        "comp_methods": comp_methods,
+    }
+
+
+def _read_entry_header(mm, pak_file: str, name: str, header_offset: int, block_size: int,
+                       comp_methods: list) -> PakEntry:
+    """读取数据区中条目自带的头（OFFSET ZSIZE SIZE ZIP HASH [CHUNKS] ENCRYPTED CHUNK_SIZE）"""
+    r = _Reader(mm, header_offset)
+    _, zsize, size, zip_index = r.unpack("<QQQI")
+    entry_hash = r.read(20)
+    chunks = []
+    if zip_index != 0:
+        count = r.unpack("<I")
+        chunks = [r.unpack("<QQ") for _ in range(count)]
+    encrypted = r.unpack("<B") != 0
+    chunk_size = r.unpack("<I")
+    data_offset = r.pos
+
+    blocks = []
+    pos = data_offset
+    for start, end in chunks:
+        zs = end - start
+        blocks.append((pos, zs))
+        pos += align16(zs) if encrypted else zs
+
+    return PakEntry(path=name, pak=pak_file, offset=data_offset, zsize=zsize, size=size,
+                    comp=_comp_name(comp_methods, zip_index), hash=entry_hash,
+                    encrypted=encrypted, block_size=chunk_size or block_size,
+                    header_offset=header_offset, blocks=blocks)
+
+
+def _mount_prefix(mount_point: str) -> str:
+    """去掉挂载点前的 ../../../，得到条目路径前缀"""
+    prefix = mount_point.replace("\\", "/")
+    while prefix.startswith("../"):
+        prefix = prefix[3:]
+    return prefix.strip("/")
+
+
+def read_pak_index(pak_file: str) -> PakIndex:
+    """读取单个 pak 的索引；索引或条目头被截断（如未下载完整的 pak）时抛出 PakError"""
+    try:
+        return _read_pak_index(pak_file)
+    except struct.error as e:
+        raise PakError(f"pak 数据不完整: {e}") from e
+
+
+def _read_pak_index(pak_file: str) -> PakIndex:
+    with open(pak_file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        footer = _read_footer(mm)
+        index_off, index_size = footer["offset"], footer["size"]
+        if index_off <= 0 or index_size <= 0 or index_off + index_size > len(mm):
+            raise PakError(f"索引范围无效: offset={index_off:#x} size={index_size:#x}")
+
+        key = derive_pak_key(pak_file)
+        if footer["encrypted"]:
+            data = decrypt_span(key, mm, index_off, index_size)
+        else:
+            data = mm[index_off:index_off + index_size]
+
+        r = _Reader(data)
+        mount_point = r.fstring()
+        file_count = r.unpack("<I")
+        r.pos += 12                     # PathHashSeed + bHasPathHashIndex
+        r.pos += 16 + 24                # PathHashIndex offset/size/hash + bHasFullDirectoryIndex
+        names_offset, _names_size = r.unpack("<QQ")
+        r.pos += 24                     # FDI hash + EncodedPakEntries 大小
+        encoded_base = r.pos
+
+        index = PakIndex(pak=pak_file, version=footer["version"], mount_point=mount_point,
+                         comp_methods=footer["comp_methods"], encrypted_index=footer["encrypted"])
+        prefix = _mount_prefix(mount_point)
+
+        r.pos = names_offset - index_off
+        for _ in range(r.unpack("<I")):
+            dir_name = r.fstring().replace("\\", "/").strip("/")
+            for _ in range(r.unpack("<I")):
+                file_name = r.fstring()
+                encoded = r.unpack("<I")
+                full = "/".join(p for p in (prefix, dir_name, file_name) if p)
+                if encoded in INVALID_ENTRY:
+                    index.skipped.append(full)
+                    continue
+
+                e = _Reader(data, encoded_base + encoded)
+                flags = e.unpack("<I")
+                block_size = (flags & 0x3F) << 11
+                if flags & 0x3F == 0x3F:
+                    block_size = e.unpack("<I")
+                header_offset = e.unpack("<I" if flags >> 28 == 0xE else "<Q") ^ ENTRY_OFFSET_XOR
+                index.add(_read_entry_header(mm, pak_file, full, header_offset, block_size,
+                                             footer["comp_methods"]))
+
+        if len(index.entries) + len(index.skipped) != file_count:
+            logger.warning(f"[索引] {path.basename(pak_file)} 条目数不一致："
+                           f"头部 {file_count}，目录索引 {len(index.entries) + len(index.skipped)}")
+        if index.skipped:
+            logger.debug(f"[索引] {path.basename(pak_file)} 忽略 {len(index.skipped)} 个条目")
+        return index
+
+
+def list_pak_files(pak_dir: str) -> list:
+    """列出目录下所有 .pak 文件（按文件名排序）"""
+    return [path.join(pak_dir, f) for f in sorted(listdir(pak_dir)) if f.lower().endswith(".pak")]
+
+
+def read_pak_indexes(pak_dir: str) -> list:
+    """读取目录下全部 pak 的索引，单个 pak 解析失败时跳过"""
+    indexes = []
+    start = time.perf_counter()
+    for pak_file in list_pak_files(pak_dir):
+        try:
+            indexes.append(read_pak_index(pak_file))
+        except (PakError, OSError, struct.error, ValueError) as e:
+            logger.error(f"[索引] 解析失败 {pak_file}: {e}")
+    count = sum(len(i.entries) for i in indexes)
+    logger.info(f"[索引] 共 {len(indexes)} 个 pak，{count} 个条目，用时 {time.perf_counter() - start:.2f}s")
+    return indexes
+
+
+if __name__ == "__main__":
+    from config_manager import ConfigManager
+
+    cfg = ConfigManager()
+    for idx in read_pak_indexes(str(cfg.get("pak_path"))):
+        logger.info(f"{path.basename(idx.pak)}: {len(idx.entries)} 个文件, "
+                    f"{idx.total_size / 1024 ** 2:.1f} MB, 压缩方式 {idx.comp_methods}")
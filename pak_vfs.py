@@ -0,0 +1,238 @@
+"""
+pak 只读虚拟文件系统
+把 Paks 目录挂载到一个虚拟根路径（通常就是 unpack_path），转换流程用 vfs.walk / vfs.listdir / vfs.open
+读取资源时直接从 pak 中解密解压，不再需要先把整个目录写到磁盘再读回来；
+挂载点以外的路径照常走真实文件系统。只有 umodel 这类必须读取真实文件的工具才用 materialize 临时落盘
+"""
+import io
+import mmap
+import shutil
+import threading
+from contextlib import contextmanager
+from os import path, listdir, walk, makedirs
+from loguru import logger
+from pak_cache import load_pak_index
+from pak_crypto import derive_pak_key
+from pak_decompress import BlockDecompressor
+from pak_reader import PakEntry, PakError, list_pak_files
+
+
+def _norm(p: str) -> str:
+    """统一为小写、/ 分隔、无首尾分隔符的路径键"""
+    p = path.normpath(str(p).replace("\\", "/")).replace("\\", "/")
+    return p.strip("/").lower() if p != "." else ""
+
+
+class PakFS:
+    """一组 pak 合并后的只读文件树（路径大小写不敏感）"""
+
+    def __init__(self, pak_dir: str):
+        self.pak_dir = pak_dir
+        self.files = {}      # 小写路径 -> PakEntry
+        self.children = {}   # 小写目录 -> {小写名称: 原始名称}
+        self.subdirs = {}    # 小写目录 -> {小写子目录名}
+        self._maps = {}      # pak -> (file, mmap, key)
+        self._lock = threading.Lock()
+        self._decompressor = BlockDecompressor(threads=1)
+        for pak_file in list_pak_files(pak_dir):
+            try:
+                index = load_pak_index(pak_file)
+            except (PakError, OSError, ValueError) as e:
+                logger.error(f"[VFS] 索引读取失败 {pak_file}: {e}")
+                continue
+            for entry in index.entries.values():
+                self._add(entry)
+        self.children.setdefault("", {})
+        logger.info(f"[VFS] 已挂载 {pak_dir}：{len(self.files)} 个文件")
+
+    def _add(self, entry: PakEntry):
+        key = entry.path.lower()
+        self.files[key] = entry
+        parts = entry.path.split("/")
+        parent = ""
+        for i, name in enumerate(parts):
+            self.children.setdefault(parent, {})[name.lower()] = name
+            child = f"{parent}/{name.lower()}" if parent else name.lower()
+            if i < len(parts) - 1:
+                self.subdirs.setdefault(parent, set()).add(name.lower())
+            parent = child
+
+    def close(self):
+        with self._lock:
+            for f, mm, _ in self._maps.values():
+                mm.close()
+                f.close()
+            self._maps.clear()
+
+    def isfile(self, rel: str) -> bool:
+        return rel in self.files
+
+    def isdir(self, rel: str) -> bool:
+        return rel in self.children
+
+    def listdir(self, rel: str) -> list:
+        if rel not in self.children:
+            raise FileNotFoundError(rel)
+        return sorted(self.children[rel].values())
+
+    def split(self, rel: str):
+        """目录下的 (子目录名列表, 文件名列表)，保留原始大小写"""
+        names = self.children.get(rel, {})
+        dirs = self.subdirs.get(rel, set())
+        return ([names[n] for n in sorted(dirs)],
+                [names[n] for n in sorted(names) if n not in dirs])
+
+    def _map(self, pak_file: str):
+        with self._lock:
+            if pak_file not in self._maps:
+                f = open(pak_file, "rb")
+                self._maps[pak_file] = (f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ),
+                                        derive_pak_key(pak_file))
+            return self._maps[pak_file]
+
+    def read(self, rel: str) -> bytes:
+        entry = self.files.get(rel)
+        if entry is None:
+            raise FileNotFoundError(rel)
+        _, mm, key = self._map(entry.pak)
+        return bytes(self._decompressor.read(mm, entry, key))
+
+
+class VirtualFS:
+    """挂载表 + 与 os / os.path 同名的读取接口"""
+
+    def __init__(self):
+        self.mounts = []  # [(挂载根的路径键, PakFS)]
+
+    def mount(self, pak_dir: str, root: str) -> PakFS:
+        fs = PakFS(pak_dir)
+        self.unmount(root)
+        self.mounts.append((_norm(root), fs))
+        # 更深的挂载点优先匹配
+        self.mounts.sort(key=lambda m: len(m[0]), reverse=True)
+        return fs
+
+    def unmount(self, root: str):
+        key = _norm(root)
+        for m in [m for m in self.mounts if m[0] == key]:
+            m[1].close()
+            self.mounts.remove(m)
+
+    @contextmanager
+    def mounted(self, pak_dir: str, root: str):
+        self.mount(pak_dir, root)
+        try:
+            yield self
+        finally:
+            self.unmount(root)
+
+    def _resolve(self, p: str):
+        """返回 (PakFS, 相对路径键)；不在任何挂载点下时返回 (None, None)"""
+        if not self.mounts:
+            return None, None
+        key = _norm(p)
+        for root, fs in self.mounts:
+            if key == root:
+                return fs, ""
+            if key.startswith(root + "/") or not root:
+                return fs, key[len(root):].lstrip("/")
+        return None, None
+
+    def is_virtual(self, p: str) -> bool:
+        fs, rel = self._resolve(p)
+        return fs is not None and (fs.isfile(rel) or fs.isdir(rel))
+
+    def exists(self, p: str) -> bool:
+        return self.is_virtual(p) or path.exists(p)
+
+    def isfile(self, p: str) -> bool:
+        fs, rel = self._resolve(p)
+        if fs is not None and fs.isfile(rel):
+            return True
+        return path.isfile(p)
+
+    def isdir(self, p: str) -> bool:
+        fs, rel = self._resolve(p)
+        if fs is not None and fs.isdir(rel):
+            return True
+        return path.isdir(p)
+
+    def listdir(self, p: str) -> list:
+        fs, rel = self._resolve(p)
+        if fs is not None and fs.isdir(rel):
+            return fs.listdir(rel)
+        return listdir(p)
+
+    def walk(self, top: str):
+        """与 os.walk 相同，返回的目录路径以传入的 top 开头"""
+        fs, rel = self._resolve(top)
+        if fs is None or not fs.isdir(rel):
+            yield from walk(top)
+            return
+        dirs, files = fs.split(rel)
+        yield top, dirs, files
+        for d in dirs:
+            yield from self.walk(path.join(top, d))
+
+    def getsize(self, p: str) -> int:
+        fs, rel = self._resolve(p)
+        if fs is not None and fs.isfile(rel):
+            return fs.files[rel].size
+        return path.getsize(p)
+
+    def entry_hash(self, p: str):
+        """虚拟文件在 pak 索引中记录的 sha1；真实文件返回 None"""
+        fs, rel = self._resolve(p)
+        if fs is not None and fs.isfile(rel):
+            return fs.files[rel].hash
+        return None
+
+    def read_bytes(self, p: str) -> bytes:
+        fs, rel = self._resolve(p)
+        if fs is not None and fs.isfile(rel):
+            return fs.read(rel)
+        with open(p, "rb") as f:
+            return f.read()
+
+    def open(self, p: str, mode: str = "r", encoding: str = None, errors: str = None):
+        """只读打开；虚拟文件返回内存流"""
+        fs, rel = self._resolve(p)
+        if fs is None or not fs.isfile(rel):
+            return open(p, mode, encoding=encoding, errors=errors)
+        if any(c in mode for c in "wax+"):
+            raise PermissionError(f"虚拟文件只读: {p}")
+        data = io.BytesIO(fs.read(rel))
+        if "b" in mode:
+            return data
+        return io.TextIOWrapper(data, encoding=encoding or "utf-8", errors=errors)
+
+    def copy(self, src: str, dst: str):
+        """复制到真实路径（对应 shutil.copy）"""
+        if path.isdir(dst):
+            dst = path.join(dst, path.basename(src))
+        fs, rel = self._resolve(src)
+        if fs is None or not fs.isfile(rel):
+            shutil.copy(src, dst)
+            return dst
+        with open(dst, "wb") as f:
+            f.write(fs.read(rel))
+        return dst
+
+    def materialize(self, p: str, dest_dir: str) -> str:
+        """
+        把一个 UE 资源包（同名的 .uasset / .uexp / .ubulk）写到 dest_dir，供 umodel 等外部工具读取
+        真实文件直接返回原路径
+        """
+        if not self.is_virtual(p):
+            return p
+        makedirs(dest_dir, exist_ok=True)
+        root, name = path.split(p)
+        stem = path.splitext(name)[0]
+        for ext in (".uasset", ".uexp", ".ubulk"):
+            src = path.join(root, stem + ext)
+            if self.isfile(src):
+                self.copy(src, path.join(dest_dir, stem + ext))
+        return path.join(dest_dir, name)
+
+
+vfs = VirtualFS()
@@ -0,0 +1,173 @@
+"""
+PNG 编码阶段
+TGA / 解码后的像素 → PNG 的 deflate 压缩很吃 CPU，放在全局调度器持有的进程池里做，
+在途的编码任务与线程中的解码共用 cpu 槽位上限；进程数与压缩等级可在配置中调整。
+输出档位（output_profile）决定写出的格式：归档用常规 PNG，日常预览用低压缩 PNG 或无损 WebP
+"""
+import threading
+import uuid
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from functools import partial
+from os import path, replace, remove
+from shutil import rmtree
+from loguru import logger
+from PIL import Image
+from config_manager import ConfigManager
+import texture_cache
+from scheduler import scheduler
+
+
+
+@dataclass(frozen=True)
+class OutputProfile:
+    """输出档位：扩展名 + PIL 保存格式与参数"""
+    name: str
+    ext: str
+    format: str
+    options: dict = field(default_factory=dict)
+
+    def save(self, img, dest: str):
+        if self.format == "WEBP" and img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA")
+        img.save(dest, self.format, **self.options)
+
+
+# archive: 归档导出，压缩等级取配置 png_compress_level
+# fast: 日常比对新版本用，压缩等级 1，编码快数倍、文件大一些
+# webp-lossless: 无损 WebP，method=0 编码最快且通常仍比 PNG 小；exact 保留全透明像素的颜色
+OUTPUT_PROFILES = ("archive", "fast", "webp-lossless")
+
+
+def get_profile(name: str = None) -> OutputProfile:
+    """按名称取输出档位，为空时读取配置 output_profile"""
+    cfg = ConfigManager()
+    name = name or cfg.get("output_profile", "archive")
+    if name == "fast":
+        return OutputProfile(name, ".png", "PNG", {"compress_level": 1})
+    if name == "webp-lossless":
+        return OutputProfile(name, ".webp", "WEBP", {"lossless": True, "method": 0, "quality": 0, "exact": True})
+    if name != "archive":
+        logger.warning(f"[输出档位] 未知档位 {name!r}，使用 archive")
+        name = "archive"
+    return OutputProfile(name, ".png", "PNG", {"compress_level": cfg.get("png_compress_level", 6)})
+
+
+def save_image(img, dest: str, profile: OutputProfile):
+    """先写到同目录的临时文件再原子替换，并发或中断时不会留下写了一半的图片"""
+    root, name = path.split(dest)
+    tmp = path.join(root, f".{name}.{uuid.uuid4().hex}.tmp")
+    try:
+        profile.save(img, tmp)
+        replace(tmp, dest)
+    except BaseException:
+        if path.exists(tmp):
+            remove(tmp)
+        raise
+
+
+def encode_png(src, stem: str, profile: OutputProfile, cache_key: str = None) -> str:
+    """
+    src 为 TGA 等图像文件路径，或 RGBA 像素数组；stem 为不含扩展名的输出路径，
+    扩展名由输出档位决定，返回写出的文件路径；cache_key 非空时同时放入贴图缓存
+    """
+    dest = stem + profile.ext
+    if isinstance(src, str):
+        with Image.open(src) as img:
+            save_image(img, dest, profile)
+    else:
+        save_image(Image.fromarray(src, "RGBA"), dest, profile)
+    texture_cache.store(cache_key, dest)
+    return dest
+
+
+def _log_result(src, stem: str, profile: OutputProfile, error: BaseException = None):
+    if error is None:
+        logger.success(f"[成功] {profile.ext[1:].upper()} 生成成功: {stem + profile.ext}")
+    else:
+        name = src if isinstance(src, str) else path.basename(stem)
+        logger.error(f"[图像处理失败] 无法处理 {name} → {error}")
+
+
+class PngEncoder:
+    """
+    一批转换的编码入口：submit 不等待编码完成，cleanup 目录在这一批最后一张图写完后删除；
+    进程池由全局调度器持有、全进程共用，每个在途任务占一个 cpu 槽（槽满时提交方等待，
+    解码后的像素不会在内存里堆积），close 只等待本批提交的任务
+    """
+
+    def __init__(self, workers: int = None, profile: str = None):
+        self.profile = get_profile(profile)
+        self._pool = scheduler.process_pool(workers or ConfigManager().get("png_workers"))
+        # 本批已提交、回调尚未执行完（日志与临时目录清理）的任务数
+        self._outstanding = 0
+        self._idle = threading.Condition()
+
+    def submit(self, jobs, cleanup: str = None):
+        """jobs: [(src, stem, cache_key)]"""
+        jobs = list(jobs)
+        remaining = [len(jobs)]
+        lock = threading.Lock()
+
+        def finish(src, stem, future=None, error=None):
+            scheduler.release("cpu")
+            try:
+                if future is not None:
+                    error = future.exception()
+                _log_result(src, stem, self.profile, error)
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last and cleanup:
+                    rmtree(cleanup, ignore_errors=True)
+            finally:
+                with self._idle:
+                    self._outstanding -= 1
+                    self._idle.notify_all()
+
+        if not jobs and cleanup:
+            rmtree(cleanup, ignore_errors=True)
+        for src, stem, cache_key in jobs:
+            scheduler.acquire("cpu")
+            with self._idle:
+                self._outstanding += 1
+            try:
+                future = self._pool.submit(encode_png, src, stem, self.profile, cache_key)
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    scheduler.discard_process_pool(self._pool)
+                finish(src, stem, error=e)
+                continue
+            future.add_done_callback(partial(finish, src, stem))
+
+    def close(self):
+        """等待本批提交的编码全部完成（共用的进程池保持运行）"""
+        with self._idle:
+            self._idle.wait_for(lambda: self._outstanding == 0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def encode_pngs(jobs, cleanup: str = None, encoder: PngEncoder = None, profile: str = None):
+    """
+    有编码阶段时交给进程池异步完成（使用 encoder 的输出档位），否则按 profile 在当前线程就地编码；
+    两种方式都会负责删除 cleanup 目录
+    """
+    if encoder is not None:
+        encoder.submit(jobs, cleanup)
+        return
+    output = get_profile(profile)
+    try:
+        for src, stem, cache_key in jobs:
+            try:
+                encode_png(src, stem, output, cache_key)
+                _log_result(src, stem, output)
+            except Exception as e:
+                _log_result(src, stem, output, e)
+    finally:
+        if cleanup:
+            rmtree(cleanup, ignore_errors=True)
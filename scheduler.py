@@ -0,0 +1,251 @@
+"""
+进程内全局任务调度
+贴图、Spine、音频等各阶段都把工作提交到同一个有界线程池，不再各自嵌套开 min(32, cpu*4) 的线程池；
+外部工具（umodel / vgmstream / ffmpeg）、CPU 计算、磁盘 I/O 各有独立的并发上限（配置 tool_slots / cpu_slots / io_slots），
+总并发只取决于这几个上限，可按机器调整。
+提交时按预估耗时从大到小排序（最长任务优先）：有历史记录的用上次耗时，没有的按文件大小折算，
+避免几张 8K CG 或长 BGM 最后才开始、拖长整轮运行。
+图片编码等需要独立进程的 CPU 工作使用调度器持有的同一个进程池，每个在途任务同样占一个 cpu 槽。
+一轮运行中已完成的 (操作, 源, 目标) 工作项记在 work_log 中，各流程重复提交同一项时直接跳过；
+内容相同的贴图也在 work_log 中登记首个输出，之后各次调用中的重复项直接链接过去
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import contextmanager
+from os import cpu_count, path, makedirs, replace
+from loguru import logger
+from config_manager import ConfigManager, ROOT_DIR
+
+# 未配置（0）时 io 的默认并发数：机械盘 / 网络盘上更高的并发只会增加寻道
+DEFAULT_IO_SLOTS = 4
+STATS_FILE = path.join(ROOT_DIR, "cache", "job_stats.json")
+# 还没有任何历史记录时，按这个吞吐量把文件大小折算为耗时
+DEFAULT_BYTES_PER_SECOND = 20 * 1024 * 1024
+# 历史耗时的平滑系数：新耗时所占权重
+STATS_SMOOTHING = 0.5
+
+
+class JobStats:
+    """任务耗时记录：{任务键: [秒, 字节数]}，保存在本地文件中供下次运行排序"""
+
+    def __init__(self, stats_file: str = STATS_FILE):
+        self.stats_file = stats_file
+        self._lock = threading.Lock()
+        self._stats = None
+        self._dirty = False
+
+    def _load(self):
+        if self._stats is not None:
+            return
+        self._stats = {}
+        if path.isfile(self.stats_file):
+            try:
+                with open(self.stats_file, "r", encoding="utf-8") as f:
+                    self._stats = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"[调度] 耗时记录读取失败，重新统计: {e}")
+
+    def _bytes_per_second(self) -> float:
+        seconds = sum(s for s, _ in self._stats.values())
+        size = sum(b for _, b in self._stats.values())
+        return size / seconds if seconds > 0 and size > 0 else DEFAULT_BYTES_PER_SECOND
+
+    def estimates(self, keys: list, sizes: list) -> list:
+        """每个任务的预估耗时（秒）：有历史按历史，否则按大小 / 历史平均吞吐量"""
+        with self._lock:
+            self._load()
+            rate = self._bytes_per_second()
+            return [self._stats[key][0] if key in self._stats else size / rate
+                    for key, size in zip(keys, sizes)]
+
+    def record(self, key: str, seconds: float, size: int):
+        with self._lock:
+            self._load()
+            if key in self._stats:
+                seconds = self._stats[key][0] * (1 - STATS_SMOOTHING) + seconds * STATS_SMOOTHING
+            self._stats[key] = [round(seconds, 3), size]
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                makedirs(path.dirname(self.stats_file), exist_ok=True)
+                tmp = self.stats_file + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(self._stats, f, ensure_ascii=False)
+                replace(tmp, self.stats_file)
+                self._dirty = False
+            except OSError as e:
+                logger.warning(f"[调度] 耗时记录写入失败: {e}")
+
+
+class Scheduler:
+    """全局调度器：map 提交工作，slot 在工作内部占用某类资源"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._executor = None
+        self._processes = None
+        self._slots = None
+        self.limits = None
+        self.stats = JobStats()
+
+    def _ensure(self):
+        """首次使用时按配置建立线程池与资源槽，之后保持不变"""
+        with self._lock:
+            if self._executor is not None:
+                return
+            cfg = ConfigManager()
+            cores = cpu_count() or 1
+            self.limits = {
+                "tool": cfg.get("tool_slots") or cores,
+                "cpu": cfg.get("cpu_slots") or cores,
+                "io": cfg.get("io_slots") or DEFAULT_IO_SLOTS,
+            }
+            self._slots = {name: threading.BoundedSemaphore(n) for name, n in self.limits.items()}
+            # 每个工作同一时刻最多占一个资源槽，线程数等于槽位总数即可
+            self._executor = ThreadPoolExecutor(max_workers=sum(self.limits.values()),
+                                                thread_name_prefix="cbunpak")
+            logger.debug(f"[调度] 资源上限 {self.limits}")
+
+    @contextmanager
+    def slot(self, resource: str):
+        """占用一个 tool / cpu / io 资源槽"""
+        self.acquire(resource)
+        try:
+            yield
+        finally:
+            self.release(resource)
+
+    def acquire(self, resource: str):
+        """不能用 with 包住的场合（如进程池任务在回调中结束）手动占用 / 释放资源槽"""
+        self._ensure()
+        self._slots[resource].acquire()
+
+    def release(self, resource: str):
+        self._slots[resource].release()
+
+    def process_pool(self, workers: int = None) -> ProcessPoolExecutor:
+        """
+        全进程共用的进程池，首次使用时创建：进程数为 workers 与 cpu 槽位数中较小者（workers 为空时取 cpu 槽位数）；
+        提交方应为每个在途任务占一个 cpu 槽，使进程中的工作与线程中的解码共用同一个 CPU 上限
+        """
+        self._ensure()
+        with self._lock:
+            if self._processes is None:
+                size = min(workers or self.limits["cpu"], self.limits["cpu"])
+                self._processes = ProcessPoolExecutor(max_workers=size)
+                logger.debug(f"[调度] 进程池 {size} 个进程")
+            return self._processes
+
+    def discard_process_pool(self, pool: ProcessPoolExecutor):
+        """子进程异常退出后进程池不可再用，丢弃它，下次使用时重新创建"""
+        with self._lock:
+            if self._processes is pool:
+                self._processes = None
+        pool.shutdown(wait=False)
+
+    def _run(self, fn, args, key: str = None, size: int = 0):
+        self._local.worker = True
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self._local.worker = False
+            if key is not None:
+                self.stats.record(key, time.perf_counter() - start, size)
+
+    def map(self, fn, items, key=None, size=None) -> list:
+        """
+        对 items 中每个参数元组调用 fn，等待全部完成并按原顺序返回结果（第一个异常会抛出）
+        key(*args) 给出任务在耗时记录中的键，size(*args) 给出输入字节数，
+        两者任一提供时按预估耗时从大到小提交，并记录本次耗时
+        已经在调度线程内调用时就地顺序执行，避免外层工作占着线程等内层工作而把线程池耗尽
+        """
+        items = list(items)
+        if getattr(self._local, "worker", False):
+            return [fn(*args) for args in items]
+        self._ensure()
+        keys = [key(*args) if key else None for args in items]
+        sizes = [size(*args) if size else 0 for args in items]
+        order = range(len(items))
+        if key or size:
+            costs = self.stats.estimates(keys, sizes)
+            order = sorted(order, key=lambda i: costs[i], reverse=True)
+        futures = {i: self._executor.submit(self._run, fn, items[i], keys[i], sizes[i]) for i in order}
+        try:
+            return [futures[i].result() for i in range(len(items))]
+        finally:
+            if key:
+                self.stats.save()
+
+
+class WorkLog:
+    """
+    本轮运行已领取的工作项：{(操作, 源, 目标, ...)}，以及按内容键登记的首个产物（跨多次转换调用去重）
+    只在 run() 范围内记录，最外层 run() 结束时清空，下一轮（如界面上再点一次）重新转换
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._claimed = set()
+        self._outputs = {}  # 内容键 -> (首个产物路径, 产物完成事件)
+        self._depth = 0
+
+    @contextmanager
+    def run(self):
+        with self._lock:
+            self._depth += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._claimed.clear()
+                    # 兜底：不让任何等待者一直阻塞
+                    for _, done in self._outputs.values():
+                        done.set()
+                    self._outputs.clear()
+
+    def claim(self, items: list, key) -> list:
+        """返回 items 中本轮还没有领取过的项并把它们记为已领取；key(item) 给出工作项的键"""
+        with self._lock:
+            if self._depth == 0:
+                return list(items)
+            fresh = []
+            for item in items:
+                k = key(item)
+                if k not in self._claimed:
+                    self._claimed.add(k)
+                    fresh.append(item)
+            return fresh
+
+    def share_output(self, key, dest: str):
+        """
+        内容相同的产物本轮只生成一次：key 第一次出现时登记 dest 并返回 None，由调用方生成，完成后调用 finish_outputs；
+        之后再出现时返回 (首个产物路径, 完成事件)，事件置位后首个产物已经生成（或已确定失败）。run() 之外不登记
+        """
+        with self._lock:
+            if self._depth == 0:
+                return None
+            if key in self._outputs:
+                return self._outputs[key]
+            self._outputs[key] = (dest, threading.Event())
+            return None
+
+    def finish_outputs(self, keys):
+        """share_output 登记的产物已经处理完（无论成败），唤醒等待它们的调用"""
+        with self._lock:
+            events = [self._outputs[k][1] for k in keys if k in self._outputs]
+        for done in events:
+            done.set()
+
+
+scheduler = Scheduler()
+work_log = WorkLog()
@@ -0,0 +1,136 @@
+"""
+测试用的合成资源：按 pak_reader / uasset_reader 解析的布局写出最小的 pak 与 Texture2D 资源包
+"""
+import hashlib
+import struct
+import zlib
+from Crypto.Cipher import AES
+from pak_crypto import derive_pak_key, align16
+from pak_reader import PAK_MAGIC, INDEX_OFFSET_XOR, ENTRY_OFFSET_XOR
+
+PAK_BLOCK = 64 * 1024
+
+
+def _fstring(s: str) -> bytes:
+    b = s.encode("utf-8") + b"\0"
+    return struct.pack("<i", len(b)) + b
+
+
+def _pad16(b: bytes) -> bytes:
+    return b + b"\0" * (align16(len(b)) - len(b))
+
+
+def make_pak(pak_file: str, files: dict, compress=(), encrypt=(), encrypt_index: bool = True,
+             block: int = PAK_BLOCK, mount: str = "../../../", comp_name: str = "Zlib"):
+    """
+    files: {条目路径: 内容}；compress / encrypt 为需要 zlib 分块压缩 / AES 加密的条目路径
+    comp_name 为页脚中登记的压缩方式名（数据总是用 zlib 压缩，换成 Oodle 可模拟无法解压的条目）
+    秘钥与游戏相同（按 pak 文件名派生），索引默认加密
+    """
+    ecb = AES.new(derive_pak_key(pak_file), AES.MODE_ECB)
+    data = bytearray()
+    header_offsets = {}
+    for p, content in files.items():
+        header_offsets[p] = len(data)
+        digest = hashlib.sha1(content).digest()
+        encrypted = p in encrypt
+        if p in compress:
+            blocks = [zlib.compress(content[i:i + block]) for i in range(0, len(content), block)]
+            # 块表中的偏移相对条目头起点，pak_reader 只用其差值（块大小）
+            chunks, pos = [], 0
+            for b in blocks:
+                chunks.append((pos, pos + len(b)))
+                pos += align16(len(b)) if encrypted else len(b)
+            header = struct.pack("<QQQI", 0, sum(map(len, blocks)), len(content), 1) + digest
+            header += struct.pack("<I", len(blocks)) + b"".join(struct.pack("<QQ", s, e) for s, e in chunks)
+            header += struct.pack("<BI", encrypted, block)
+            body = b"".join(ecb.encrypt(_pad16(b)) if encrypted else b for b in blocks)
+        else:
+            header = struct.pack("<QQQI", 0, len(content), len(content), 0) + digest + struct.pack("<BI", encrypted, 0)
+            body = ecb.encrypt(_pad16(content)) if encrypted else content
+        data += header + body
+
+    index_offset = len(data)
+    encoded, encoded_offsets = bytearray(), {}
+    for p in files:
+        encoded_offsets[p] = len(encoded)
+        encoded += struct.pack("<II", 0xE0000000 | (block >> 11), header_offsets[p] ^ ENTRY_OFFSET_XOR)
+    head = _fstring(mount) + struct.pack("<I", len(files)) + b"\0" * 12 + b"\0" * (16 + 24)
+    directories = {}
+    for p in files:
+        parent, _, name = p.rpartition("/")
+        directories.setdefault(parent + "/", []).append((name, encoded_offsets[p]))
+    fdi = struct.pack("<I", len(directories))
+    for directory, items in directories.items():
+        fdi += _fstring(directory) + struct.pack("<I", len(items))
+        for name, offset in items:
+            fdi += _fstring(name) + struct.pack("<I", offset)
+    names_offset = index_offset + len(head) + 16 + 24 + len(encoded)
+    index = _pad16(head + struct.pack("<QQ", names_offset, len(fdi)) + b"\0" * 24 + encoded + fdi)
+    if encrypt_index:
+        index = ecb.encrypt(index)
+
+    out = bytearray(data) + index + b"\0" * 15 + bytes([encrypt_index])
+    out += struct.pack("<IIQQ", PAK_MAGIC, 11, index_offset ^ INDEX_OFFSET_XOR, 0) + b"\0" * 20
+    out += comp_name.encode().ljust(32, b"\0") + b"\0" * 32 * 4
+    with open(pak_file, "wb") as f:
+        f.write(out)
+
+
+def make_texture(stem: str, pixel_format: str, width: int, height: int, mip: bytes, class_name: str = "Texture2D",
+                 packed: int = 1, opt_data: bytes = b""):
+    """
+    写出 stem.uasset / .uexp / .ubulk：一个 Texture2D（或 class_name）导出，最大一层 mip 放在 .ubulk，
+    packed 为平台数据的 PackedData（可带立方体 / HasOptData 位），opt_data 为其后的 FOptTexturePlatformData
+    """
+    names = ["None", "/Script/Engine", class_name, "Class", "/Script/CoreUObject", "Package", "T_Test",
+             "SRGB", "BoolProperty", pixel_format]
+    index = {n: i for i, n in enumerate(names)}
+
+    def fname(n):
+        return struct.pack("<ii", index[n], 0)
+
+    def summary(name_offset, import_offset, export_offset, total, bulk_start):
+        h = struct.pack("<Iiiiii", 0x9E2A83C1, -7, 864, 522, 0, 0)
+        h += struct.pack("<i", total) + _fstring("None") + struct.pack("<Iii", 0x80000000, len(names), name_offset)
+        h += struct.pack("<ii", 0, 0)
+        h += struct.pack("<iiiii", 1, export_offset, 2, import_offset, 0)
+        h += struct.pack("<iiii", 0, 0, 0, 0) + b"\0" * 16
+        h += struct.pack("<i", 1) + struct.pack("<ii", 1, len(names))
+        for _ in range(2):
+            h += struct.pack("<HHHI", 4, 27, 2, 0) + _fstring("++UE4+Release-4.27")
+        h += struct.pack("<IiIii", 0, 0, 0, 0, 0) + struct.pack("<q", bulk_start)
+        h += struct.pack("<iiii", 0, 0, 0, 0)
+        return h
+
+    name_table = b"".join(_fstring(n) + b"\0" * 4 for n in names)
+    imports = fname("/Script/CoreUObject") + fname("Class") + struct.pack("<i", -2) + fname(class_name)
+    imports += fname("/Script/CoreUObject") + fname("Package") + struct.pack("<i", 0) + fname("/Script/Engine")
+
+    def export(size, offset):
+        return (struct.pack("<iiii", -1, 0, 0, 0) + fname("T_Test") + struct.pack("<I", 0x1)
+                + struct.pack("<qq", size, offset) + b"\0" * (12 + 16 + 4 + 8 + 20))
+
+    name_offset = len(summary(0, 0, 0, 0, 0))
+    import_offset = name_offset + len(name_table)
+    export_offset = import_offset + len(imports)
+    total = export_offset + len(export(0, 0))
+
+    obj = fname("SRGB") + fname("BoolProperty") + struct.pack("<ii", 0, 0) + b"\1\0" + fname("None")
+    obj += struct.pack("<i", 0) + b"\0" * 4 + struct.pack("<i", 1) + fname(pixel_format) + struct.pack("<q", 0)
+    obj += struct.pack("<iiI", width, height, packed) + _fstring(pixel_format) + opt_data
+    obj += struct.pack("<ii", 0, 1)  # FirstMipToSerialize, NumMips
+    # mip0：负载在 .ubulk（PAYLOAD_IN_SEPERATE_FILE | NO_OFFSET_FIXUP）
+    obj += struct.pack("<i", 1) + struct.pack("<Iiiq", 0x100 | 0x10000, len(mip), len(mip), 0)
+    obj += struct.pack("<iii", width, height, 1)
+    obj += struct.pack("<i", 0) + fname("None")
+
+    uasset = summary(name_offset, import_offset, export_offset, total, total + len(obj))
+    uasset += name_table + imports + export(len(obj), total)
+    assert len(uasset) == total
+    with open(stem + ".uasset", "wb") as f:
+        f.write(uasset)
+    with open(stem + ".uexp", "wb") as f:
+        f.write(obj + b"\xC1\x83\x2A\x9E")
+    with open(stem + ".ubulk", "wb") as f:
+        f.write(mip)
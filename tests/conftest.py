@@ -0,0 +1,23 @@
+"""
+测试环境：模块从仓库根目录导入；配置文件、索引缓存、耗时记录等写到临时目录，不落在仓库里
+"""
+import sys
+import tempfile
+from os import path, remove
+
+REPO_DIR = path.dirname(path.dirname(path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+# config_manager 导入时会在程序目录生成默认配置；原本没有时测试结束后删掉
+_REPO_CONFIG = path.join(REPO_DIR, "config.json")
+_had_config = path.isfile(_REPO_CONFIG)
+
+import config_manager  # noqa: E402
+
+# 必须在其它模块导入之前替换：各模块在导入时按 ROOT_DIR 计算缓存路径
+config_manager.ROOT_DIR = tempfile.mkdtemp(prefix="cbunpak-test-")
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not _had_config and path.isfile(_REPO_CONFIG):
+        remove(_REPO_CONFIG)
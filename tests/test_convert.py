@@ -0,0 +1,105 @@
+import binascii
+import os
+import threading
+import time
+import pytest
+from builders import make_texture
+import convert
+import texture_cache
+from convert import _out_dir
+from scheduler import work_log
+
+MIP = bytes(range(256)) * 4  # 16x16 B8G8R8A8
+
+
+def test_out_dir_keeps_relative_layout(tmp_path):
+    src, out = str(tmp_path / "in"), str(tmp_path / "out")
+    assert _out_dir(src, src, out) == out
+    assert _out_dir(os.path.join(src, "Dlc01_plots", "Bg"), src, out) == os.path.join(out, "Dlc01_plots", "Bg")
+
+
+def _textures(directory, stems, seed=0):
+    """内容各不相同的贴图（seed 相同时同名贴图内容相同）"""
+    os.makedirs(directory, exist_ok=True)
+    for i, stem in enumerate(stems):
+        make_texture(os.path.join(directory, stem), "PF_B8G8R8A8", 16, 16, bytes([seed + i]) + MIP[1:])
+
+
+def test_native_textures_decoded_per_file(tmp_path, monkeypatch):
+    src, out = str(tmp_path / "in"), str(tmp_path / "out")
+    stems = [f"T_Bg_{i:02d}" for i in range(6)]
+    _textures(os.path.join(src, "Bg"), stems)
+
+    active, peak = [0], [0]
+    lock = threading.Lock()
+    original = convert.export_texture_png
+
+    def export(*args):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        try:
+            return original(*args)
+        finally:
+            with lock:
+                active[0] -= 1
+
+    monkeypatch.setattr(convert, "export_texture_png", export)
+    convert.convert_to_png(src, out, "fast")
+    # 同一目录的贴图不再在一个任务里逐个解码
+    assert peak[0] > 1
+    assert sorted(os.listdir(os.path.join(out, "Bg"))) == [f"{stem}.png" for stem in stems]
+
+
+def test_dedupe_across_calls(tmp_path, monkeypatch):
+    src, out = tmp_path / "in", tmp_path / "out"
+    # 同一张背景出现在两个剧情目录和 UI 目录下，各自由一次 convert_to_png 转换
+    for sub in ("Dlc01_plots/Bg", "Dlc02_plots/Bg", "Picture"):
+        _textures(str(src / sub), ["T_Shared"], seed=7)
+    _textures(str(src / "Picture"), ["T_Own"], seed=9)
+    monkeypatch.setattr(texture_cache, "cache_limit", lambda: 0)  # 不让贴图缓存掩盖去重
+    exported = []
+    original = convert.export_texture_png
+    monkeypatch.setattr(convert, "export_texture_png", lambda *args: exported.append(args[0]) or original(*args))
+
+    with work_log.run():
+        for sub in ("Dlc01_plots/Bg", "Dlc02_plots/Bg", "Picture"):
+            convert.convert_to_png(str(src / sub), str(out / sub), "fast")
+
+    assert sorted(os.path.basename(p) for p in exported) == ["T_Own.uexp", "T_Shared.uexp"]
+    first = out / "Dlc01_plots" / "Bg" / "T_Shared.png"
+    for sub in ("Dlc02_plots/Bg", "Picture"):
+        assert os.path.samefile(first, out / sub / "T_Shared.png")
+    assert (out / "Picture" / "T_Own.png").is_file()
+
+
+def _split_via_text(raw: bytes, clean_filename):
+    """原先的做法：整个文件 hexlify 再整体解码成字符串后查找"""
+    text = bytes.fromhex(binascii.hexlify(raw).decode("utf-8")).decode("utf-8", errors="ignore")
+    start_png = text.find(f"{clean_filename}.png")
+    end_atlas = text.rfind("index: -1") + len("index: -1")
+    start_json = text.find('{\n"skeleton": {')
+    if start_json == -1:
+        start_json = text.find('{"skeleton":{"hash":')
+    end_json = text.rfind("}")
+    return (text[start_png:end_atlas] if start_png != -1 and end_atlas != -1 else "",
+            text[start_json:end_json + 1] if start_json != -1 and end_json != -1 else "")
+
+
+SPINE_UEXP = [
+    (b"\x00\xff\xfe" + "角色".encode("utf-8") + b"\x9e\x2a" + "Hero_01.png\nsize: 2048,2048\n立绘\nindex: -1\n".encode("utf-8")
+     + b"\xc1\x83" + b'{"skeleton":{"hash":"x"},"bones":[{"name":"' + "根".encode("utf-8") + b'"}]}' + b"\x80\x00"),
+    b'junk{\n"skeleton": {\n"spine": "3.8"\n}\n}tail\xe4',
+    b"\x01\x02 no markers here",
+]
+
+
+@pytest.mark.parametrize("raw", SPINE_UEXP)
+def test_split_and_save_matches_text_path(tmp_path, raw):
+    uexp = tmp_path / "Hero_01-data.uexp"
+    uexp.write_bytes(raw)
+    expected = _split_via_text(raw, "Hero_01")
+    assert convert.split_and_save(raw, "Hero_01") == expected
+    with convert._map_file(str(uexp)) as mm:
+        assert convert.split_and_save(mm, "Hero_01") == expected
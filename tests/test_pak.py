@@ -0,0 +1,141 @@
+import os
+import pytest
+from builders import make_pak
+from pak_diff import load_install_index
+from pak_extract import JOURNAL_DIR, extract_paks, plan_shards
+from pak_reader import PakError, read_pak_index, list_pak_files
+
+BASE = "pakchunk0-WindowsNoEditor.pak"
+PATCH = "pakchunk0-WindowsNoEditor_0_P.pak"
+
+
+def _read(out_dir, entry_path):
+    with open(os.path.join(out_dir, *entry_path.split("/")), "rb") as f:
+        return f.read()
+
+
+@pytest.fixture
+def files():
+    big = os.urandom(150 * 1024) + b"\0" * 100 * 1024  # 跨多个 64 KB 块
+    return {
+        "Game/Content/stored.wem": os.urandom(5000),
+        "Game/Content/zlib.uexp": big,
+        "Game/Content/enc.uasset": os.urandom(777),
+        "Game/Content/UI/enc_zlib.ubulk": big[::-1],
+        "Game/Content/UI/empty.uexp": b"",
+    }
+
+
+def test_round_trip(tmp_path, files):
+    pak_dir, out_dir = tmp_path / "paks", str(tmp_path / "out")
+    pak_dir.mkdir()
+    make_pak(str(pak_dir / BASE), files,
+             compress={"Game/Content/zlib.uexp", "Game/Content/UI/enc_zlib.ubulk"},
+             encrypt={"Game/Content/enc.uasset", "Game/Content/UI/enc_zlib.ubulk"})
+
+    index = read_pak_index(str(pak_dir / BASE))
+    assert set(index.entries) == set(files)
+    assert index.entries["Game/Content/zlib.uexp"].comp == "zlib"
+    assert index.entries["Game/Content/UI/enc_zlib.ubulk"].encrypted
+
+    summary = extract_paks(str(pak_dir), out_dir, max_workers=1)
+    assert not summary["failed"]
+    for entry_path, content in files.items():
+        assert _read(out_dir, entry_path) == content
+
+
+def test_patch_overrides_base(tmp_path):
+    pak_dir, out_dir = tmp_path / "paks", str(tmp_path / "out")
+    pak_dir.mkdir()
+    make_pak(str(pak_dir / BASE), {"Game/a.uexp": b"OLD", "Game/b.uexp": b"B"})
+    make_pak(str(pak_dir / PATCH), {"Game/a.uexp": b"NEW"})
+    pak_files = list_pak_files(str(pak_dir))
+
+    plan = plan_shards(pak_files)
+    planned = [(os.path.basename(pak), e.path) for pak, entries in plan["shards"] for e in entries]
+    assert sorted(planned) == [(BASE, "Game/b.uexp"), (PATCH, "Game/a.uexp")]
+    assert plan["overridden"] == 1
+    assert load_install_index(str(pak_dir))["Game/a.uexp"].pak.endswith(PATCH)
+
+    for run in range(3):
+        summary = extract_paks(str(pak_dir), out_dir, max_workers=2, update=True)
+        assert _read(out_dir, "Game/a.uexp") == b"NEW"
+        # 首次写出两个文件，之后内容不变不再重写
+        assert summary["files"] == (2 if run == 0 else 0)
+
+
+def test_truncated_pak_raises_pak_error(tmp_path):
+    pak_file = str(tmp_path / BASE)
+    make_pak(pak_file, {f"Game/f{i}.uexp": os.urandom(3000) for i in range(8)})
+    with open(pak_file, "rb") as f:
+        raw = f.read()
+    tail = raw[-0xCC - 16:]
+    for cut in range(0, len(raw) - len(tail), 211):
+        with open(pak_file, "wb") as f:
+            f.write(raw[:cut] + tail)
+        with pytest.raises((PakError, ValueError)):
+            read_pak_index(pak_file)
+
+
+def test_load_install_index_skips_broken_pak(tmp_path):
+    make_pak(str(tmp_path / BASE), {"Game/a.uexp": b"A"})
+    with open(tmp_path / PATCH, "wb") as f:
+        f.write(b"\0" * 0x100)
+    assert set(load_install_index(str(tmp_path))) == {"Game/a.uexp"}
+
+
+def test_update_removes_only_journaled_files(tmp_path):
+    pak_dir, out_dir = tmp_path / "paks", tmp_path / "out"
+    pak_dir.mkdir()
+    # 解包目录中原有的其它文件（转换结果等），首次解包就不能删
+    own = [out_dir / "CgPlot" / "bg.png", out_dir / "Game" / "notes.txt"]
+    for p in own:
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_bytes(b"user data")
+    make_pak(str(pak_dir / BASE), {"Game/a.uexp": b"A", "Game/Old/b.uexp": b"B"})
+    assert extract_paks(str(pak_dir), str(out_dir), max_workers=1, update=True)["deleted"] == 0
+
+    make_pak(str(pak_dir / BASE), {"Game/a.uexp": b"A2"})
+    summary = extract_paks(str(pak_dir), str(out_dir), max_workers=1, update=True)
+    assert summary["deleted"] == 1
+    assert _read(str(out_dir), "Game/a.uexp") == b"A2"
+    assert not (out_dir / "Game" / "Old").exists()
+    assert all(p.read_bytes() == b"user data" for p in own)
+
+
+def test_resume_rewrites_unjournaled_file(tmp_path, files):
+    pak_dir, out_dir = tmp_path / "paks", str(tmp_path / "out")
+    pak_dir.mkdir()
+    make_pak(str(pak_dir / BASE), files, compress={"Game/Content/zlib.uexp"})
+    extract_paks(str(pak_dir), out_dir, max_workers=1)
+
+    # 模拟中断：最后一个条目只写了一半，日志也没来得及记录
+    victim = "Game/Content/zlib.uexp"
+    with open(os.path.join(out_dir, *victim.split("/")), "r+b") as f:
+        f.truncate(1000)
+    journal_dir = os.path.join(out_dir, JOURNAL_DIR)
+    for name in os.listdir(journal_dir):
+        with open(os.path.join(journal_dir, name), "r", encoding="utf-8") as f:
+            lines = [line for line in f if not line.rstrip("\n").endswith(victim)]
+        with open(os.path.join(journal_dir, name), "w", encoding="utf-8") as f:
+            f.writelines(lines)
+            f.write("deadbeef\t12")  # 写了一半的末行
+
+    summary = extract_paks(str(pak_dir), out_dir, max_workers=1)
+    assert summary["resumed"] == len(files) - 1 and summary["files"] == 1
+    for entry_path, content in files.items():
+        assert _read(out_dir, entry_path) == content
+
+
+def test_oodle_entries_reported_as_group(tmp_path):
+    pak_dir, out_dir = tmp_path / "paks", str(tmp_path / "out")
+    pak_dir.mkdir()
+    oodle = {f"Game/o{i}.uexp" for i in range(3)}
+    make_pak(str(pak_dir / BASE), {**{p: b"x" * 100 for p in oodle}, "Game/plain.uexp": b"P"},
+             compress=oodle, comp_name="Oodle")
+
+    plan = plan_shards(list_pak_files(str(pak_dir)))
+    assert sorted(plan["unsupported"]["oodle"]) == sorted(oodle)
+    assert [e.path for _, entries in plan["shards"] for e in entries] == ["Game/plain.uexp"]
+    summary = extract_paks(str(pak_dir), out_dir, max_workers=1)
+    assert sorted(summary["failed"]) == sorted(oodle) and summary["files"] == 1
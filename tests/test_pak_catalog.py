@@ -0,0 +1,48 @@
+import pytest
+from builders import make_pak
+from pak_catalog import open_catalog, add_version, list_versions, first_seen, last_changed, which_pak, dir_growth
+
+BASE = "pakchunk0-WindowsNoEditor.pak"
+PATCH = "pakchunk0-WindowsNoEditor_0_P.pak"
+
+
+@pytest.fixture
+def conn(tmp_path):
+    v1 = tmp_path / "V1.9.0.7" / "Paks"
+    v2 = tmp_path / "V1.10.0.2" / "Paks"
+    v1.mkdir(parents=True)
+    v2.mkdir(parents=True)
+    make_pak(str(v1 / BASE), {"Game/UI/a.uexp": b"A", "Game/UI/T_x.uexp": b"X", "Game/Other/o.uexp": b"O"})
+    make_pak(str(v2 / BASE), {"Game/UI/a.uexp": b"A2", "Game/UI/T_x.uexp": b"X", "Game/Other/o.uexp": b"O",
+                              "Game/UI/Tax.uexp": b"TAX"})
+    make_pak(str(v2 / PATCH), {"Game/UI/Sub/c.uexp": b"CC"})
+    conn = open_catalog(str(tmp_path / "catalog.db"))
+    # 录入顺序与版本先后无关：1.10 排在 1.9 之后
+    add_version(conn, "V1.10.0.2", str(v2))
+    add_version(conn, "V1.9.0.7", str(v1))
+    yield conn
+    conn.close()
+
+
+def test_versions_ordered_by_number(conn):
+    assert list_versions(conn) == [("V1.9.0.7", 3, 3), ("V1.10.0.2", 5, 9)]
+
+
+def test_first_seen_and_last_changed(conn):
+    # 路径按不区分大小写的顺序排列
+    assert first_seen(conn, "Game/UI/*") == [
+        ("Game/UI/a.uexp", "V1.9.0.7"), ("Game/UI/Sub/c.uexp", "V1.10.0.2"),
+        ("Game/UI/T_x.uexp", "V1.9.0.7"), ("Game/UI/Tax.uexp", "V1.10.0.2")]
+    assert last_changed(conn, "Game/UI/*.uexp") == [
+        ("Game/UI/a.uexp", "V1.10.0.2"), ("Game/UI/Sub/c.uexp", "V1.10.0.2"),
+        ("Game/UI/T_x.uexp", "V1.9.0.7"), ("Game/UI/Tax.uexp", "V1.10.0.2")]
+
+
+def test_which_pak(conn):
+    assert which_pak(conn, "*/c.uexp") == [("Game/UI/Sub/c.uexp", "V1.10.0.2", PATCH, 2, "")]
+    # 通配符之外的 _ 按字面匹配，不会匹配到 Tax.uexp
+    assert [row[0] for row in which_pak(conn, "Game/UI/T_x.uexp", "V1.9.0.7")] == ["Game/UI/T_x.uexp"]
+
+
+def test_dir_growth(conn):
+    assert dir_growth(conn, "Game\\UI") == [("V1.9.0.7", 2, 2), ("V1.10.0.2", 4, 8)]
@@ -0,0 +1,66 @@
+import os
+import pytest
+from builders import make_pak
+from pak_vfs import VirtualFS
+
+FILES = {
+    "Game/Content/UI/Bg/T_Bg.uasset": b"header",
+    "Game/Content/UI/Bg/T_Bg.uexp": os.urandom(3000),
+    "Game/Content/UI/Bg/T_Bg.ubulk": os.urandom(200 * 1024),
+    "Game/Content/Settings/riki.txt": "标题\tBGM_DLC01_name\n".encode("utf-8"),
+}
+
+
+@pytest.fixture
+def fs(tmp_path):
+    pak_dir = tmp_path / "Paks"
+    pak_dir.mkdir()
+    make_pak(str(pak_dir / "pakchunk0-WindowsNoEditor.pak"), FILES,
+             compress={"Game/Content/UI/Bg/T_Bg.ubulk", "Game/Content/Settings/riki.txt"},
+             encrypt={"Game/Content/Settings/riki.txt"})
+    vfs = VirtualFS()
+    root = str(tmp_path / "unpack")
+    with vfs.mounted(str(pak_dir), root):
+        yield vfs, root
+
+
+def test_walk_and_stat(fs):
+    vfs, root = fs
+    walked = {os.path.relpath(r, root): (dirs, files) for r, dirs, files in vfs.walk(os.path.join(root, "Game"))}
+    assert walked[os.path.join("Game", "Content")] == (["Settings", "UI"], [])
+    assert walked[os.path.join("Game", "Content", "UI", "Bg")] == ([], ["T_Bg.uasset", "T_Bg.ubulk", "T_Bg.uexp"])
+    bulk = os.path.join(root, "Game", "Content", "UI", "Bg", "T_Bg.ubulk")
+    assert vfs.isfile(bulk) and vfs.is_virtual(bulk) and not os.path.exists(bulk)
+    assert vfs.getsize(bulk) == len(FILES["Game/Content/UI/Bg/T_Bg.ubulk"])
+    # 路径大小写不敏感，Windows 风格分隔符也能解析
+    assert vfs.isdir(root + "\\game\\content\\ui")
+
+
+def test_open_and_read(fs):
+    vfs, root = fs
+    riki = os.path.join(root, "Game", "Content", "Settings", "riki.txt")
+    with vfs.open(riki, "r", encoding="utf-8") as f:
+        assert f.read() == FILES["Game/Content/Settings/riki.txt"].decode("utf-8")
+    with pytest.raises(PermissionError):
+        vfs.open(riki, "w")
+    uexp = os.path.join(root, "Game", "Content", "UI", "Bg", "T_Bg.uexp")
+    assert vfs.read_bytes(uexp) == FILES["Game/Content/UI/Bg/T_Bg.uexp"]
+
+
+def test_materialize_package(fs, tmp_path):
+    vfs, root = fs
+    dest = str(tmp_path / "scratch")
+    out = vfs.materialize(os.path.join(root, "Game", "Content", "UI", "Bg", "T_Bg.uexp"), dest)
+    assert out == os.path.join(dest, "T_Bg.uexp")
+    for ext in (".uasset", ".uexp", ".ubulk"):
+        with open(os.path.join(dest, "T_Bg" + ext), "rb") as f:
+            assert f.read() == FILES["Game/Content/UI/Bg/T_Bg" + ext]
+
+
+def test_real_paths_fall_through(fs, tmp_path):
+    vfs, root = fs
+    real = tmp_path / "real.txt"
+    real.write_bytes(b"on disk")
+    assert not vfs.is_virtual(str(real))
+    assert vfs.read_bytes(str(real)) == b"on disk"
+    assert vfs.materialize(str(real), str(tmp_path / "unused")) == str(real)
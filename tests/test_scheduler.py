@@ -0,0 +1,87 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from scheduler import JobStats, Scheduler, WorkLog
+
+
+@pytest.fixture
+def sched(tmp_path):
+    s = Scheduler()
+    s.stats = JobStats(str(tmp_path / "job_stats.json"))
+    s._ensure()
+    return s
+
+
+def test_map_keeps_order_and_bounds_slots(sched):
+    limit = sched.limits["cpu"]
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def work(i):
+        with sched.slot("cpu"):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+        return i * i
+
+    assert sched.map(work, [(i,) for i in range(12)]) == [i * i for i in range(12)]
+    assert peak[0] <= limit
+
+
+def test_longest_job_first(sched):
+    for key, seconds in (("a", 1.0), ("b", 5.0), ("c", 3.0)):
+        sched.stats.record(key, seconds, 0)
+    sched._executor = ThreadPoolExecutor(max_workers=1)  # 单线程：开始顺序即提交顺序
+    started = []
+    sched.map(started.append, [("a",), ("b",), ("c",), ("new",)],
+              key=lambda k: k, size=lambda k: 200 * 1024 ** 2 if k == "new" else 0)
+    # 没有历史的任务按大小 / 吞吐量估算：历史记录没有字节数时按默认 20 MB/s，200 MB 约 10 秒
+    assert started == ["new", "b", "c", "a"]
+
+
+def test_nested_map_runs_inline(sched):
+    sched._executor = ThreadPoolExecutor(max_workers=1)
+
+    def outer(i):
+        return sum(sched.map(lambda j: j, [(j,) for j in range(i)]))
+
+    assert sched.map(outer, [(3,), (4,)]) == [3, 6]
+
+
+def test_stats_saved(sched, tmp_path):
+    sched.map(lambda x: x, [(1,)], key=lambda x: f"job:{x}", size=lambda x: 10)
+    reloaded = JobStats(str(tmp_path / "job_stats.json"))
+    assert reloaded.estimates(["job:1"], [10])[0] < 1
+
+
+def test_work_log():
+    log = WorkLog()
+    items = [("a", 1), ("b", 2)]
+    assert log.claim(items, lambda item: item[0]) == items  # run() 之外不记录
+    with log.run():
+        assert log.claim(items, lambda item: item[0]) == items
+        with log.run():
+            assert log.claim(items + [("c", 3)], lambda item: item[0]) == [("c", 3)]
+        assert log.claim(items, lambda item: item[0]) == []
+    with log.run():
+        assert log.claim(items, lambda item: item[0]) == items  # 新一轮重新开始
+
+
+def test_work_log_shares_outputs():
+    log = WorkLog()
+    assert log.share_output("k", "/a.png") is None  # run() 之外不登记
+    with log.run():
+        assert log.share_output("k", "/a.png") is None
+        first, done = log.share_output("k", "/b.png")
+        assert first == "/a.png" and not done.is_set()
+        log.finish_outputs(["k"])
+        assert done.is_set()
+        log.share_output("k2", "/c.png")
+        _, pending = log.share_output("k2", "/d.png")
+    assert pending.is_set()  # 本轮结束时唤醒所有等待者
+    with log.run():
+        assert log.share_output("k", "/b.png") is None
@@ -0,0 +1,66 @@
+import os
+import pytest
+import texture_cache
+from png_encode import get_profile
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / "cache")
+
+
+def _package(directory, stem, payload: bytes):
+    os.makedirs(directory, exist_ok=True)
+    for ext, data in ((".uasset", b"header"), (".uexp", payload)):
+        with open(os.path.join(directory, stem + ext), "wb") as f:
+            f.write(data)
+    return os.path.join(directory, stem + ".uexp")
+
+
+def test_content_key(tmp_path):
+    archive, fast = get_profile("archive"), get_profile("fast")
+    a = _package(str(tmp_path / "a"), "T_Bg", b"pixels")
+    b = _package(str(tmp_path / "b"), "T_Bg", b"pixels")
+    c = _package(str(tmp_path / "c"), "T_Bg", b"other!")
+    # 内容相同的包在不同目录得到同一个键；内容或输出档位不同则不同
+    assert texture_cache.content_key(a, archive) == texture_cache.content_key(b, archive)
+    assert texture_cache.content_key(a, archive) != texture_cache.content_key(c, archive)
+    assert texture_cache.content_key(a, archive) != texture_cache.content_key(a, fast)
+    assert texture_cache.content_key(str(tmp_path / "missing.uexp"), archive) is None
+
+
+def test_store_and_fetch(tmp_path, cache_dir):
+    produced = tmp_path / "T_Bg.png"
+    produced.write_bytes(b"png data")
+    texture_cache.store("ab" * 16, str(produced), cache_dir)
+
+    dest = tmp_path / "out" / "T_Bg.png"
+    dest.parent.mkdir()
+    assert texture_cache.fetch("ab" * 16, str(dest), cache_dir)
+    assert dest.read_bytes() == b"png data"
+    assert not texture_cache.fetch("cd" * 16, str(tmp_path / "out" / "miss.png"), cache_dir)
+    assert not texture_cache.fetch(None, str(tmp_path / "out" / "none.png"), cache_dir)
+
+
+def test_evict_least_recently_used(tmp_path, cache_dir):
+    keys = [f"{i:02x}" * 16 for i in range(5)]
+    for age, key in enumerate(keys):
+        src = tmp_path / f"{key}.png"
+        src.write_bytes(b"x" * 1000)
+        texture_cache.store(key, str(src), cache_dir)
+        cached = texture_cache.cache_path(key, ".png", cache_dir)
+        os.utime(cached, (1000 + age, 1000 + age))
+    # 命中会刷新使用时间，最旧的一项因此保留下来
+    assert texture_cache.fetch(keys[0], str(tmp_path / "hit.png"), cache_dir)
+
+    texture_cache.evict(limit=3000, cache_dir=cache_dir)
+    left = [k for k in keys if os.path.isfile(texture_cache.cache_path(k, ".png", cache_dir))]
+    assert left == [keys[0], keys[4]]  # 删到上限的 90% 以下：2700 字节以内
+
+
+def test_evict_disabled(tmp_path, cache_dir):
+    src = tmp_path / "a.png"
+    src.write_bytes(b"x" * 1000)
+    texture_cache.store("ef" * 16, str(src), cache_dir)
+    texture_cache.evict(limit=0, cache_dir=cache_dir)
+    assert os.path.isfile(texture_cache.cache_path("ef" * 16, ".png", cache_dir))
@@ -0,0 +1,33 @@
+import pytest
+from builders import make_texture
+from texture_export import read_texture2d, PLATFORM_DATA_CUBEMAP, PLATFORM_DATA_HAS_OPT_DATA
+from uasset_reader import UAssetError
+from asset_sniff import asset_class
+
+MIP = bytes(range(256)) * 4  # 16x16 B8G8R8A8
+
+
+def test_reads_largest_mip(tmp_path):
+    stem = str(tmp_path / "T_Plain")
+    make_texture(stem, "PF_B8G8R8A8", 16, 16, MIP)
+    assert read_texture2d(stem + ".uexp") == ("PF_B8G8R8A8", 16, 16, MIP)
+
+
+def test_skips_opt_data(tmp_path):
+    stem = str(tmp_path / "T_Opt")
+    make_texture(stem, "PF_B8G8R8A8", 16, 16, MIP, packed=1 | PLATFORM_DATA_HAS_OPT_DATA, opt_data=b"\7" * 8)
+    assert read_texture2d(stem + ".uexp") == ("PF_B8G8R8A8", 16, 16, MIP)
+
+
+def test_rejects_cubemap(tmp_path):
+    stem = str(tmp_path / "T_Cube")
+    make_texture(stem, "PF_B8G8R8A8", 16, 16, MIP, packed=6 | PLATFORM_DATA_CUBEMAP)
+    with pytest.raises(UAssetError):
+        read_texture2d(stem + ".uexp")
+
+
+@pytest.mark.parametrize("class_name", ["Texture2D", "SpineAtlasAsset", "SoundWave"])
+def test_asset_class(tmp_path, class_name):
+    stem = str(tmp_path / f"A_{class_name}")
+    make_texture(stem, "PF_B8G8R8A8", 16, 16, MIP, class_name=class_name)
+    assert asset_class(stem + ".uexp") == class_name
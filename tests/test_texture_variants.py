@@ -0,0 +1,39 @@
+import pytest
+from loguru import logger
+import texture_variants
+from texture_variants import resolve_variants
+
+
+@pytest.fixture
+def textures(tmp_path):
+    sizes = {"T_Bg": 400, "T_Bg_144": 100, "T_Char_sd": 50, "T_Char": 300, "T_Only_144": 10}
+    for stem, size in sizes.items():
+        (tmp_path / f"{stem}.uasset").write_bytes(b"h")
+        (tmp_path / f"{stem}.uexp").write_bytes(b"x" * size)
+    return str(tmp_path), [f"{stem}.uexp" for stem in sizes]
+
+
+def test_default_groups_only_144(textures):
+    root, files = textures
+    # 默认只有 _144：T_Char_sd 是另一张贴图（Q 版立绘），不能与 T_Char 合并
+    assert resolve_variants(root, files) == ["T_Bg.uexp", "T_Char_sd.uexp", "T_Char.uexp", "T_Only_144.uexp"]
+
+
+def test_custom_suffixes_and_prefer(textures):
+    root, files = textures
+    assert resolve_variants(root, files, suffixes=[r"_144", r"_sd"], prefer="smallest") == \
+        ["T_Bg_144.uexp", "T_Char_sd.uexp", "T_Only_144.uexp"]
+    assert resolve_variants(root, files, suffixes=[]) == files
+
+
+def test_unknown_prefer_warns_once(textures, monkeypatch):
+    root, files = textures
+    monkeypatch.setattr(texture_variants, "_warned_prefer", set())
+    messages = []
+    handler = logger.add(messages.append, level="WARNING", format="{message}")
+    try:
+        for _ in range(2):
+            assert resolve_variants(root, files, prefer="biggest") == resolve_variants(root, files, prefer="largest")
+    finally:
+        logger.remove(handler)
+    assert len(messages) == 1 and "biggest" in messages[0]
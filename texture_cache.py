@@ -0,0 +1,159 @@
+"""
+贴图转换结果缓存
+以资源包（.uasset + .uexp + .ubulk）内容哈希 + 输出档位为键保存转换好的图片，
+大部分贴图在不同游戏版本之间字节完全相同，命中时直接硬链接 / 复制缓存，不再经过 umodel 与编码；
+缓存总大小超过 texture_cache_mb 时按最近使用时间淘汰
+"""
+import hashlib
+import shutil
+import time
+import uuid
+from functools import lru_cache
+from os import path, makedirs, link, replace, remove, utime, walk, stat
+from loguru import logger
+from config_manager import ROOT_DIR, ConfigManager
+from pak_vfs import vfs
+
+CACHE_DIR = path.join(ROOT_DIR, "cache", "textures")
+# 解码 / 导出逻辑变化时递增，使旧缓存全部失效
+CACHE_VERSION = 1
+PACKAGE_EXTS = (".uasset", ".uexp", ".ubulk", ".uptnl")
+HASH_CHUNK = 4 * 1024 * 1024
+# 淘汰时删到上限的这个比例以下，避免每次运行都只删一两个文件
+EVICT_TARGET = 0.9
+
+
+def cache_limit() -> int:
+    """缓存上限（字节），0 表示关闭缓存"""
+    return int(ConfigManager().get("texture_cache_mb", 0) or 0) * 1024 * 1024
+
+
+def _package_signature(stem: str) -> tuple:
+    """资源包各文件的廉价身份：pak 中的虚拟文件取索引 sha1，真实文件取 (大小, mtime)"""
+    signature = []
+    for ext in PACKAGE_EXTS:
+        file_path = stem + ext
+        entry_hash = vfs.entry_hash(file_path)
+        if entry_hash is not None:
+            signature.append((ext, entry_hash))
+        elif path.isfile(file_path):
+            st = stat(file_path)
+            signature.append((ext, st.st_size, st.st_mtime_ns))
+    return tuple(signature)
+
+
+@lru_cache(maxsize=65536)
+def _package_hash(stem: str, signature: tuple) -> bytes:
+    """资源包内容哈希；同一次运行中去重与缓存查询都会用到，按文件身份记住结果，只读一遍"""
+    h = hashlib.blake2b(digest_size=16)
+    for ext, *ident in signature:
+        h.update(ext.encode("ascii"))
+        if len(ident) == 1:
+            h.update(b"pak" + ident[0])
+            continue
+        with open(stem + ext, "rb") as f:
+            while chunk := f.read(HASH_CHUNK):
+                h.update(chunk)
+    return h.digest()
+
+
+def content_key(file_path: str, profile) -> str:
+    """资源包内容 + 输出档位的哈希键，与缓存是否开启无关；读取失败时返回 None"""
+    stem = path.splitext(file_path)[0]
+    try:
+        signature = _package_signature(stem)
+        if not signature:
+            return None
+        package_hash = _package_hash(stem, signature)
+    except OSError as e:
+        logger.debug(f"[贴图缓存] 无法计算哈希 {file_path}: {e}")
+        return None
+    h = hashlib.blake2b(package_hash, digest_size=16)
+    h.update(f"{CACHE_VERSION}|{profile.name}|{sorted(profile.options.items())}".encode("utf-8"))
+    return h.hexdigest()
+
+
+def package_key(file_path: str, profile) -> str:
+    """资源包 + 输出档位的缓存键；缓存关闭或读取失败时返回 None"""
+    if not cache_limit():
+        return None
+    return content_key(file_path, profile)
+
+
+def cache_path(key: str, ext: str, cache_dir: str = CACHE_DIR) -> str:
+    return path.join(cache_dir, key[:2], key + ext)
+
+
+def link_or_copy(src: str, dst: str):
+    """同盘时硬链接，否则复制；先写临时名再替换"""
+    tmp = path.join(path.dirname(dst), f".{path.basename(dst)}.{uuid.uuid4().hex}.tmp")
+    try:
+        try:
+            link(src, tmp)
+        except OSError:
+            shutil.copyfile(src, tmp)
+        replace(tmp, dst)
+    except BaseException:
+        if path.exists(tmp):
+            remove(tmp)
+        raise
+
+
+def fetch(key: str, dest: str, cache_dir: str = CACHE_DIR) -> bool:
+    """命中时把缓存放到 dest 并刷新其使用时间"""
+    if not key:
+        return False
+    cached = cache_path(key, path.splitext(dest)[1], cache_dir)
+    if not path.isfile(cached):
+        return False
+    try:
+        link_or_copy(cached, dest)
+        utime(cached)
+    except OSError as e:
+        logger.warning(f"[贴图缓存] 读取失败 {cached}: {e}")
+        return False
+    return True
+
+
+def store(key: str, produced: str, cache_dir: str = CACHE_DIR):
+    """把刚生成的图片放进缓存"""
+    if not key:
+        return
+    cached = cache_path(key, path.splitext(produced)[1], cache_dir)
+    try:
+        makedirs(path.dirname(cached), exist_ok=True)
+        link_or_copy(produced, cached)
+    except OSError as e:
+        logger.warning(f"[贴图缓存] 写入失败 {cached}: {e}")
+
+
+def evict(limit: int = None, cache_dir: str = CACHE_DIR):
+    """缓存超过上限时按最近使用时间（mtime）从旧到新删除"""
+    limit = cache_limit() if limit is None else limit
+    if not limit or not path.isdir(cache_dir):
+        return
+    files = []
+    for root, _, names in walk(cache_dir):
+        for name in names:
+            file_path = path.join(root, name)
+            try:
+                st = stat(file_path)
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, file_path))
+    total = sum(size for _, size, _ in files)
+    if total <= limit:
+        return
+    start = time.perf_counter()
+    removed = 0
+    for _, size, file_path in sorted(files):
+        if total <= limit * EVICT_TARGET:
+            break
+        try:
+            remove(file_path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    logger.info(f"[贴图缓存] 淘汰 {removed} 个文件，剩余 {total / 1024 ** 2:.0f} MB，"
+                f"用时 {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,319 @@
+"""
+贴图像素格式解码（NumPy 向量化）
+按 4x4 块分条批量解码 BC1(DXT1) / BC3(DXT5) / BC4 / BC5 / BC7 与 B8G8R8A8，输出 (高, 宽, 4) 的 RGBA uint8 数组
+"""
+import numpy as np
+
+# ---- BC7 查找表（D3D11 规范） ----
+# 两分区：16 位掩码，第 i 位为像素 i 所属的分区
+_BC7_PARTITION2_MASKS = [
+    0xCCCC, 0x8888, 0xEEEE, 0xECC8, 0xC880, 0xFEEC, 0xFEC8, 0xEC80,
+    0xC800, 0xFFEC, 0xFE80, 0xE800, 0xFFE8, 0xFF00, 0xFFF0, 0xF000,
+    0xF710, 0x008E, 0x7100, 0x08CE, 0x008C, 0x7310, 0x3100, 0x8CCE,
+    0x088C, 0x3110, 0x6666, 0x366C, 0x17E8, 0x0FF0, 0x718E, 0x399C,
+    0xAAAA, 0xF0F0, 0x5A5A, 0x33CC, 0x3C3C, 0x55AA, 0x9696, 0xA55A,
+    0x73CE, 0x13C8, 0x324C, 0x3BDC, 0x6996, 0xC33C, 0x9966, 0x0660,
+    0x0272, 0x04E4, 0x4E40, 0x2720, 0xC936, 0x936C, 0x39C6, 0x639C,
+    0x9336, 0x9CC6, 0x817E, 0xE718, 0xCCF0, 0x0FCC, 0x7744, 0xEE22,
+]
+# 三分区：每行 16 个像素的分区号
+_BC7_PARTITION3 = [
+    "0011001102212222", "0001001122112221", "0000200122112211", "0222002200110111",
+    "0000000011221122", "0011001100220022", "0022002211111111", "0011001122112211",
+    "0000000011112222", "0000111111112222", "0000111122222222", "0012001200120012",
+    "0112011201120112", "0122012201220122", "0011011211221222", "0011200122002220",
+    "0001001101121122", "0111001120012200", "0000112211221122", "0022002200221111",
+    "0111011102220222", "0001000122212221", "0000001101220122", "0000110022102210",
+    "0122012200110000", "0012001211222222", "0110122112210110", "0000011012211221",
+    "0022110211020022", "0110011020022222", "0011012201220011", "0000200022112221",
+    "0000000211221222", "0222002200120011", "0011001200220222", "0120012001200120",
+    "0000111122220000", "0120120120120120", "0120201212010120", "0011220011220011",
+    "0011112222000011", "0101010122222222", "0000000021212121", "0022112200221122",
+    "0022001100220011", "0220122102201221", "0101222222220101", "0000212121212121",
+    "0101010101012222", "0222011102220111", "0002111200021112", "0000211221122112",
+    "0222011101110222", "0002111211120002", "0110011001102222", "0000000021122112",
+    "0110011022222222", "0022001100110022", "0022112211220022", "0000000000002112",
+    "0002000100020001", "0222122202221222", "0101222222222222", "0111201122012220",
+]
+_BC7_ANCHOR2 = [
+    15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15,
+    15, 2, 8, 2, 2, 8, 8, 15, 2, 8, 2, 2, 8, 8, 2, 2,
+    15, 15, 6, 8, 2, 8, 15, 15, 2, 8, 2, 2, 2, 15, 15, 6,
+    6, 2, 6, 8, 15, 15, 2, 2, 15, 15, 15, 15, 15, 2, 2, 15,
+]
+_BC7_ANCHOR3_1 = [
+    3, 3, 15, 15, 8, 3, 15, 15, 8, 8, 6, 6, 6, 5, 3, 3,
+    3, 3, 8, 15, 3, 3, 6, 10, 5, 8, 8, 6, 8, 5, 15, 15,
+    8, 15, 3, 5, 6, 10, 8, 15, 15, 3, 15, 5, 15, 15, 15, 15,
+    3, 15, 5, 5, 5, 8, 5, 10, 5, 10, 8, 13, 15, 12, 3, 3,
+]
+_BC7_ANCHOR3_2 = [
+    15, 8, 8, 3, 15, 15, 3, 8, 15, 15, 15, 15, 15, 15, 15, 8,
+    15, 8, 15, 3, 15, 8, 15, 8, 3, 15, 6, 10, 15, 15, 10, 8,
+    15, 3, 15, 10, 10, 8, 9, 10, 6, 15, 8, 15, 3, 6, 6, 8,
+    15, 3, 15, 15, 15, 15, 15, 15, 15, 15, 15, 15, 3, 15, 15, 8,
+]
+_BC7_WEIGHTS = {
+    2: np.array([0, 21, 43, 64], dtype=np.int16),
+    3: np.array([0, 9, 18, 27, 37, 46, 55, 64], dtype=np.int16),
+    4: np.array([0, 4, 9, 13, 17, 21, 26, 30, 34, 38, 43, 47, 51, 55, 60, 64], dtype=np.int16),
+}
+# 模式: (分区数, 分区位, 旋转位, 索引选择位, 颜色位, Alpha 位, 端点 P 位, 共享 P 位, 索引位, 第二索引位)
+_BC7_MODES = [
+    (3, 4, 0, 0, 4, 0, 1, 0, 3, 0),
+    (2, 6, 0, 0, 6, 0, 0, 1, 3, 0),
+    (3, 6, 0, 0, 5, 0, 0, 0, 2, 0),
+    (2, 6, 0, 0, 7, 0, 1, 0, 2, 0),
+    (1, 0, 2, 1, 5, 6, 0, 0, 2, 3),
+    (1, 0, 2, 0, 7, 8, 0, 0, 2, 2),
+    (1, 0, 0, 0, 7, 7, 1, 0, 4, 0),
+    (2, 6, 0, 0, 5, 5, 1, 0, 2, 0),
+]
+
+_PARTITION = np.zeros((4, 64, 16), dtype=np.intp)  # [分区数][分区号][像素]
+_PARTITION[2] = [[(m >> i) & 1 for i in range(16)] for m in _BC7_PARTITION2_MASKS]
+_PARTITION[3] = [[int(c) for c in row] for row in _BC7_PARTITION3]
+_ANCHOR = np.zeros((4, 64, 16), dtype=bool)          # [分区数][分区号][像素] 是否为锚点
+_ANCHOR[:, :, 0] = True
+_ANCHOR[2, np.arange(64), _BC7_ANCHOR2] = True
+_ANCHOR[3, np.arange(64), _BC7_ANCHOR3_1] = True
+_ANCHOR[3, np.arange(64), _BC7_ANCHOR3_2] = True
+
+
+# 每次解码的块数上限：整层 mip 一次解码时中间数组是输出的数十倍，4K / 8K 贴图会占用数 GB 内存，
+# 按若干行块分条解码写入预先分配的输出，峰值内存与贴图尺寸无关
+STRIP_BLOCKS = 16384
+
+
+def _decode_strips(data, width: int, height: int, block_bytes: int, decode_blocks) -> np.ndarray:
+    """
+    按块行分条解码：decode_blocks 把 (块数, block_bytes) 的 uint8 块解码为 (块数, 16, 4) 的像素，
+    结果逐条写入 (高, 宽, 4) 的 RGBA uint8 图像，裁掉补齐到 4 的部分
+    """
+    bw, bh = (width + 3) // 4, (height + 3) // 4
+    blocks = np.frombuffer(data, dtype=np.uint8, count=bw * bh * block_bytes).reshape(bh, bw, block_bytes)
+    img = np.empty((bh * 4, bw * 4, 4), dtype=np.uint8)
+    rows = max(1, STRIP_BLOCKS // bw)
+    for y in range(0, bh, rows):
+        strip = blocks[y:y + rows]
+        pixels = decode_blocks(strip.reshape(-1, block_bytes))
+        n = len(strip)
+        img[y * 4:(y + n) * 4] = pixels.reshape(n, bw, 4, 4, 4).transpose(0, 2, 1, 3, 4).reshape(n * 4, bw * 4, 4)
+    if img.shape[0] == height and img.shape[1] == width:
+        return img
+    return np.ascontiguousarray(img[:height, :width])
+
+
+def _rgb565(c: np.ndarray) -> np.ndarray:
+    r, g, b = (c >> 11) & 31, (c >> 5) & 63, c & 31
+    return np.stack([(r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)], axis=-1)
+
+
+def _color_block(blocks: np.ndarray, four_color: bool) -> np.ndarray:
+    """BC1 颜色块（8 字节）→ (块数, 16, 4) uint8；four_color 为真时（BC2/BC3）总是四色模式"""
+    words = blocks.view("<u2")
+    c0, c1 = words[:, 0].astype(np.int32), words[:, 1].astype(np.int32)
+    bits = blocks[:, 4:8].copy().view("<u4")[:, 0]
+    p0, p1 = _rgb565(c0).astype(np.int16), _rgb565(c1).astype(np.int16)
+    opaque = (c0 > c1)[:, None] | four_color
+    palette = np.empty((len(blocks), 4, 4), dtype=np.int16)
+    palette[:, 0, :3], palette[:, 1, :3] = p0, p1
+    palette[:, 2, :3] = np.where(opaque, (2 * p0 + p1) // 3, (p0 + p1) // 2)
+    palette[:, 3, :3] = np.where(opaque, (p0 + 2 * p1) // 3, 0)
+    palette[:, :, 3] = 255
+    palette[:, 3, 3] = np.where(opaque[:, 0], 255, 0)
+    index = ((bits[:, None] >> (2 * np.arange(16, dtype=np.uint32))) & 3).astype(np.intp)
+    return np.take_along_axis(palette.astype(np.uint8), index[:, :, None], axis=1)
+
+
+def _alpha_block(blocks: np.ndarray) -> np.ndarray:
+    """BC4 单通道块（8 字节）→ (块数, 16) uint8"""
+    a0, a1 = blocks[:, 0].astype(np.int16), blocks[:, 1].astype(np.int16)
+    raw = np.zeros((len(blocks), 8), dtype=np.uint8)
+    raw[:, :6] = blocks[:, 2:8]
+    bits = raw.view("<u8")[:, 0]
+    eight = (a0 > a1)[:, None]
+    i = np.arange(1, 7, dtype=np.int16)
+    palette = np.empty((len(blocks), 8), dtype=np.int16)
+    palette[:, 0], palette[:, 1] = a0, a1
+    interp7 = ((7 - i) * a0[:, None] + i * a1[:, None] + 3) // 7
+    interp5 = ((5 - i[:4]) * a0[:, None] + i[:4] * a1[:, None] + 2) // 5
+    palette[:, 2:8] = np.where(eight, interp7,
+                               np.concatenate([interp5, np.zeros((len(blocks), 1), np.int16),
+                                               np.full((len(blocks), 1), 255, np.int16)], 1))
+    index = ((bits[:, None] >> (3 * np.arange(16, dtype=np.uint64))) & 7).astype(np.intp)
+    return np.take_along_axis(palette.astype(np.uint8), index, axis=1)
+
+
+def _bc1_blocks(blocks: np.ndarray) -> np.ndarray:
+    return _color_block(blocks, four_color=False)
+
+
+def _bc3_blocks(blocks: np.ndarray) -> np.ndarray:
+    pixels = _color_block(blocks[:, 8:], four_color=True)
+    pixels[:, :, 3] = _alpha_block(blocks[:, :8])
+    return pixels
+
+
+def _bc4_blocks(blocks: np.ndarray) -> np.ndarray:
+    value = _alpha_block(blocks)
+    return np.stack([value, value, value, np.full_like(value, 255)], axis=-1)
+
+
+def _bc5_blocks(blocks: np.ndarray) -> np.ndarray:
+    """BC5（法线贴图 XY），蓝色通道按单位向量重建 Z"""
+    r, g = _alpha_block(blocks[:, :8]), _alpha_block(blocks[:, 8:])
+    x, y = r / np.float32(127.5) - 1, g / np.float32(127.5) - 1
+    z = np.sqrt(np.clip(1 - x * x - y * y, 0, 1))
+    b = np.rint((z + 1) * np.float32(127.5)).astype(np.uint8)
+    return np.stack([r, g, b, np.full_like(r, 255)], axis=-1)
+
+
+def decode_bc1(data, width: int, height: int) -> np.ndarray:
+    return _decode_strips(data, width, height, 8, _bc1_blocks)
+
+
+def decode_bc3(data, width: int, height: int) -> np.ndarray:
+    return _decode_strips(data, width, height, 16, _bc3_blocks)
+
+
+def decode_bc4(data, width: int, height: int) -> np.ndarray:
+    return _decode_strips(data, width, height, 8, _bc4_blocks)
+
+
+def decode_bc5(data, width: int, height: int) -> np.ndarray:
+    return _decode_strips(data, width, height, 16, _bc5_blocks)
+
+
+def _bits(bits: np.ndarray, pos, count: int) -> np.ndarray:
+    """从 (块数, 128) 的位数组中取 [pos, pos+count) 的无符号整数（最多 8 位）"""
+    if count == 0:
+        return np.zeros(len(bits), dtype=np.int16)
+    weights = (1 << np.arange(count)).astype(np.int16)
+    return bits[:, pos:pos + count].astype(np.int16) @ weights
+
+
+def _bc7_indices(bits: np.ndarray, start: int, index_bits: int, anchor: np.ndarray) -> np.ndarray:
+    """读取 16 个像素的索引：锚点像素少存 1 位，因此各像素的起始位置按块计算"""
+    width = index_bits - anchor.astype(np.int16)        # (块数, 16)
+    offset = start + np.cumsum(width, axis=1, dtype=np.int16) - width
+    index = np.minimum(offset[:, :, None] + np.arange(index_bits, dtype=np.int16), 127)
+    raw = np.take_along_axis(bits, index.reshape(len(bits), -1).astype(np.intp), axis=1).reshape(index.shape)
+    mask = np.arange(index_bits) < width[:, :, None]
+    return (raw * mask).astype(np.int16) @ (1 << np.arange(index_bits)).astype(np.int16)
+
+
+def _unquantize(value: np.ndarray, bits: int) -> np.ndarray:
+    return (value << (8 - bits)) | (value >> (2 * bits - 8))
+
+
+def _bc7_mode(bits: np.ndarray, mode: int) -> np.ndarray:
+    """解码同一模式的一批 BC7 块 → (块数, 16, 4)"""
+    ns, pb, rb, isb, cb, ab, epb, spb, ib, ib2 = _BC7_MODES[mode]
+    n = len(bits)
+    pos = mode + 1
+    partition = _bits(bits, pos, pb)
+    pos += pb
+    rotation = _bits(bits, pos, rb)
+    pos += rb
+    selector = _bits(bits, pos, isb)
+    pos += isb
+
+    # 端点：[块, 端点(2*分区数), 通道]
+    ends = np.zeros((n, 2 * ns, 4), dtype=np.int16)
+    for ch, size in ((0, cb), (1, cb), (2, cb), (3, ab)):
+        for e in range(2 * ns):
+            ends[:, e, ch] = _bits(bits, pos, size)
+            pos += size
+    color_bits, alpha_bits = cb, ab
+    if epb or spb:
+        if epb:
+            pbit = bits[:, pos:pos + 2 * ns].astype(np.int16)
+            pos += 2 * ns
+        else:
+            pbit = np.repeat(bits[:, pos:pos + ns].astype(np.int16), 2, axis=1)
+            pos += ns
+        ends = (ends << 1) | pbit[:, :, None]
+        color_bits += 1
+        alpha_bits += 1 if ab else 0
+    ends[:, :, :3] = _unquantize(ends[:, :, :3], color_bits)
+    ends[:, :, 3] = _unquantize(ends[:, :, 3], alpha_bits) if ab else 255
+
+    subset = _PARTITION[ns][partition] if ns > 1 else np.zeros((n, 16), dtype=np.intp)
+    anchor = _ANCHOR[ns][partition] if ns > 1 else np.broadcast_to(_ANCHOR[1][0], (n, 16))
+    index = _bc7_indices(bits, pos, ib, anchor)
+    pos += 16 * ib - ns
+    e0 = np.take_along_axis(ends, (2 * subset)[:, :, None], axis=1)
+    e1 = np.take_along_axis(ends, (2 * subset + 1)[:, :, None], axis=1)
+
+    if ib2:
+        index2 = _bc7_indices(bits, pos, ib2, np.broadcast_to(_ANCHOR[1][0], (n, 16)))
+        swap = (selector == 1)[:, None]
+        color_index = np.where(swap, index2, index)
+        alpha_index = np.where(swap, index, index2)
+        color_weight = np.where(swap, _BC7_WEIGHTS[ib2][np.minimum(color_index, 2 ** ib2 - 1)],
+                                _BC7_WEIGHTS[ib][np.minimum(color_index, 2 ** ib - 1)])
+        alpha_weight = np.where(swap, _BC7_WEIGHTS[ib][np.minimum(alpha_index, 2 ** ib - 1)],
+                                _BC7_WEIGHTS[ib2][np.minimum(alpha_index, 2 ** ib2 - 1)])
+        weight = np.concatenate([np.repeat(color_weight[:, :, None], 3, axis=2), alpha_weight[:, :, None]], 2)
+    else:
+        weight = _BC7_WEIGHTS[ib][index][:, :, None]
+    # 权重 ≤ 64、端点 ≤ 255，插值的中间结果不超过 int16
+    pixels = ((64 - weight) * e0 + weight * e1 + 32) >> 6
+
+    if rb:
+        # 旋转：1/2/3 分别把 Alpha 与 R/G/B 交换
+        for r in (1, 2, 3):
+            sel = rotation == r
+            if sel.any():
+                swapped = pixels[sel].copy()
+                swapped[:, :, [r - 1, 3]] = swapped[:, :, [3, r - 1]]
+                pixels[sel] = swapped
+    return pixels.astype(np.uint8)
+
+
+def _bc7_blocks(blocks: np.ndarray) -> np.ndarray:
+    bits = np.unpackbits(blocks, axis=1, bitorder="little")
+    # 模式号为最低位起第一个 1 的位置；首字节为 0 的块是保留模式，按规范输出全 0
+    first = blocks[:, 0]
+    mode = np.full(len(blocks), 8, dtype=np.int8)
+    for m in range(7, -1, -1):
+        mode[(first >> m) & 1 == 1] = m
+    pixels = np.zeros((len(blocks), 16, 4), dtype=np.uint8)
+    for m in range(8):
+        sel = mode == m
+        if sel.any():
+            pixels[sel] = _bc7_mode(bits[sel], m)
+    return pixels
+
+
+def decode_bc7(data, width: int, height: int) -> np.ndarray:
+    return _decode_strips(data, width, height, 16, _bc7_blocks)
+
+
+def decode_bgra8(data, width: int, height: int) -> np.ndarray:
+    img = np.frombuffer(data, dtype=np.uint8, count=width * height * 4).reshape(height, width, 4)
+    return np.ascontiguousarray(img[:, :, [2, 1, 0, 3]])
+
+
+# UE EPixelFormat 名称 -> (解码函数, 每块字节数, 块边长)
+DECODERS = {
+    "PF_B8G8R8A8": (decode_bgra8, 4, 1),
+    "PF_DXT1": (decode_bc1, 8, 4),
+    "PF_DXT5": (decode_bc3, 16, 4),
+    "PF_BC4": (decode_bc4, 8, 4),
+    "PF_BC5": (decode_bc5, 16, 4),
+    "PF_BC7": (decode_bc7, 16, 4),
+}
+
+
+def data_size(pixel_format: str, width: int, height: int) -> int:
+    """该格式下一层 mip 的数据字节数"""
+    _, block_bytes, block = DECODERS[pixel_format]
+    return ((width + block - 1) // block) * ((height + block - 1) // block) * block_bytes
+
+
+def decode(pixel_format: str, data, width: int, height: int) -> np.ndarray:
+    """解码一层 mip，返回 (高, 宽, 4) 的 RGBA uint8 数组"""
+    func = DECODERS[pixel_format][0]
+    return func(data, width, height)
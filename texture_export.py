@@ -0,0 +1,155 @@
+"""
+原生 Texture2D 导出
+直接读取 .uasset / .uexp / .ubulk，取最大一层 mip 解码后写出 PNG，不经过 umodel → TGA；
+无法处理的情况（无版本属性、不支持的像素格式、数据缺失等）返回 False，由调用方退回 umodel
+"""
+import struct
+from os import path
+from loguru import logger
+from pak_vfs import vfs
+from png_encode import encode_pngs
+from scheduler import scheduler
+from uasset_reader import UAssetError, read_package
+
+try:
+    import texture_decode
+except ImportError:  # 未安装 numpy 时只能使用 umodel
+    texture_decode = None
+
+RF_CLASS_DEFAULT_OBJECT = 0x10
+
+BULKDATA_SERIALIZE_COMPRESSED_ZLIB = 0x2
+BULKDATA_UNUSED = 0x20
+BULKDATA_FORCE_INLINE_PAYLOAD = 0x40
+BULKDATA_PAYLOAD_IN_SEPERATE_FILE = 0x100
+BULKDATA_OPTIONAL_PAYLOAD = 0x800
+BULKDATA_SIZE_64BIT = 0x2000
+BULKDATA_NO_OFFSET_FIXUP = 0x10000
+
+# FTexturePlatformData 的 PackedData：最高位为立方体贴图，次高位表示其后带 FOptTexturePlatformData
+PLATFORM_DATA_CUBEMAP = 1 << 31
+PLATFORM_DATA_HAS_OPT_DATA = 1 << 30
+
+
+def _skip_properties(r):
+    """跳过带标签（tagged）的属性列表，直到 None"""
+    while True:
+        name = r.fname()
+        if name == "None":
+            return
+        prop_type = r.fname()
+        size, _array_index = r.unpack("<ii")
+        if prop_type == "StructProperty":
+            r.fname()
+            r.pos += 16  # StructGuid
+        elif prop_type == "BoolProperty":
+            r.pos += 1
+        elif prop_type in ("ByteProperty", "EnumProperty", "ArrayProperty", "SetProperty"):
+            r.fname()
+        elif prop_type == "MapProperty":
+            r.fname()
+            r.fname()
+        if r.unpack("<B"):
+            r.pos += 16  # PropertyGuid
+        r.pos += size
+
+
+def _read_bulk(r, pkg, stem: str, uexp: bytes, files: dict):
+    """读取 FByteBulkData：返回负载数据，负载不在本包内（未使用 / 缺少 .ubulk）时返回 None"""
+    flags = r.unpack("<I")
+    if flags & BULKDATA_SIZE_64BIT:
+        _count, size = r.unpack("<qq")
+    else:
+        _count, size = r.unpack("<ii")
+    offset = r.unpack("<q")
+    if flags & BULKDATA_FORCE_INLINE_PAYLOAD:
+        return r.read(size)
+    if flags & BULKDATA_UNUSED or size <= 0:
+        return None
+    if flags & BULKDATA_SERIALIZE_COMPRESSED_ZLIB:
+        raise UAssetError("不支持压缩的 bulk data")
+    if not flags & BULKDATA_NO_OFFSET_FIXUP:
+        offset += pkg.bulk_data_start_offset
+
+    if flags & BULKDATA_PAYLOAD_IN_SEPERATE_FILE:
+        ext = ".uptnl" if flags & BULKDATA_OPTIONAL_PAYLOAD else ".ubulk"
+        if ext not in files:
+            files[ext] = vfs.read_bytes(stem + ext) if vfs.isfile(stem + ext) else None
+        blob = files[ext]
+        if blob is None:
+            return None
+    else:
+        # 包末尾的负载：偏移以 .uasset + .uexp 连续计算
+        blob, offset = uexp, offset - pkg.total_header_size
+    data = blob[offset:offset + size] if offset >= 0 else b""
+    if len(data) != size:
+        raise UAssetError(f"bulk data 越界: offset={offset} size={size}")
+    return data
+
+
+def read_texture2d(file_path: str):
+    """
+    读取贴图最大一层可用 mip：返回 (像素格式, 宽, 高, 数据)
+    file_path 为 .uasset / .uexp 任一路径，支持 VFS 中的虚拟文件
+    """
+    stem = path.splitext(file_path)[0]
+    pkg = read_package(vfs.read_bytes(stem + ".uasset"))
+    if pkg.unversioned:
+        raise UAssetError("属性为无版本格式")
+    export = next((e for e in pkg.exports if pkg.class_name(e) == "Texture2D"), None)
+    if export is None:
+        raise UAssetError("包内没有 Texture2D")
+
+    uexp = vfs.read_bytes(stem + ".uexp")
+    r = pkg.reader(uexp, export.serial_offset - pkg.total_header_size)
+    _skip_properties(r)
+    if not export.object_flags & RF_CLASS_DEFAULT_OBJECT and r.unpack("<i"):
+        r.pos += 16  # 对象 Guid
+    r.pos += 2 + 2  # UTexture / UTexture2D 的 FStripDataFlags
+    if not r.unpack("<i"):
+        raise UAssetError("贴图未烘焙（cooked）")
+    if r.fname() == "None":
+        raise UAssetError("没有平台数据")
+    r.pos += 8  # SkipOffset
+    _size_x, _size_y, packed = r.unpack("<iiI")
+    pixel_format = r.fstring()
+    if packed & PLATFORM_DATA_CUBEMAP:
+        raise UAssetError("不支持立方体贴图")
+    if packed & PLATFORM_DATA_HAS_OPT_DATA:
+        r.pos += 8  # FOptTexturePlatformData
+    r.pos += 4  # FirstMipToSerialize
+    num_mips = r.unpack("<i")
+    files = {}
+    for _ in range(num_mips):
+        r.pos += 4  # bCooked
+        data = _read_bulk(r, pkg, stem, uexp, files)
+        width, height, _depth = r.unpack("<iii")
+        if data:
+            return pixel_format, width, height, data
+    raise UAssetError("没有可用的 mip 数据")
+
+
+def export_texture_png(file_path: str, out_path: str, encoder=None, cache_key: str = None) -> bool:
+    """
+    把贴图直接导出为 out_path 下同名图片（有编码阶段 encoder 时异步编码，cache_key 非空时写入贴图缓存）；
+    不支持时返回 False
+    """
+    if texture_decode is None:
+        return False
+    file_name = path.splitext(path.basename(file_path))[0]
+    try:
+        with scheduler.slot("io"):
+            pixel_format, width, height, data = read_texture2d(file_path)
+        if pixel_format not in texture_decode.DECODERS:
+            logger.debug(f"[原生导出] 不支持的像素格式 {pixel_format}，交给 umodel: {file_name}")
+            return False
+        if len(data) < texture_decode.data_size(pixel_format, width, height):
+            raise UAssetError(f"{pixel_format} {width}x{height} 数据不足: {len(data)}")
+        with scheduler.slot("cpu"):
+            rgba = texture_decode.decode(pixel_format, data, width, height)
+    except (UAssetError, OSError, ValueError, struct.error) as e:
+        logger.debug(f"[原生导出] {file_name} 无法直接解析，交给 umodel: {e}")
+        return False
+
+    encode_pngs([(rgba, path.join(out_path, file_name), cache_key)], encoder=encoder)
+    return True
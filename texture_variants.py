@@ -0,0 +1,68 @@
+"""
+贴图分辨率 / 质量变体选择
+同一目录下基础名相同、只差尺寸或质量后缀的贴图（如 T_Bg_01 与 T_Bg_01_144）只转换一份：
+默认只识别 _144 后缀并保留最大的一份，后缀规则与取舍方式都在配置中，新增变体后缀不需要改代码
+"""
+import re
+from os import path
+from loguru import logger
+from config_manager import ConfigManager
+from pak_vfs import vfs
+
+# 参与大小比较的资源包文件（.uasset 只有头部，不计入）
+SIZE_EXTS = (".uexp", ".ubulk")
+# texture_variant_prefer 可选值，第一项为默认
+PREFER_MODES = ("largest", "smallest")
+# 已经提示过的无效 texture_variant_prefer 取值，每个值只提示一次
+_warned_prefer = set()
+
+
+def _variant_pattern(suffixes) -> re.Pattern:
+    """后缀正则列表 → 匹配 基础名 + 变体后缀 的正则（不区分大小写）"""
+    return re.compile(rf"(.+?)(?:{'|'.join(f'(?:{s})' for s in suffixes)})", re.IGNORECASE)
+
+
+def package_size(root: str, stem: str) -> int:
+    """资源包数据大小（.uexp + .ubulk），用于比较变体与估算转换耗时"""
+    size = 0
+    for ext in SIZE_EXTS:
+        file_path = path.join(root, stem + ext)
+        if vfs.isfile(file_path):
+            size += vfs.getsize(file_path)
+    return size
+
+
+def resolve_variants(root: str, files: list, suffixes=None, prefer: str = None) -> list:
+    """
+    files 为同一目录下的 .uexp 文件名；按基础名分组，每组只保留一个变体，保持原有顺序
+    suffixes / prefer 为空时读取配置 texture_variant_suffixes / texture_variant_prefer（largest / smallest）
+    只有一个成员的组原样保留，单独存在的低清贴图不会被跳过
+    """
+    cfg = ConfigManager()
+    suffixes = cfg.get("texture_variant_suffixes", []) if suffixes is None else suffixes
+    prefer = prefer or cfg.get("texture_variant_prefer", PREFER_MODES[0])
+    if prefer not in PREFER_MODES:
+        if prefer not in _warned_prefer:
+            _warned_prefer.add(prefer)
+            logger.warning(f"[变体选择] 未知的 texture_variant_prefer: {prefer}，按 {PREFER_MODES[0]} 处理")
+        prefer = PREFER_MODES[0]
+    if not suffixes or len(files) < 2:
+        return list(files)
+    pattern = _variant_pattern(suffixes)
+
+    groups = {}
+    for file in files:
+        stem = path.splitext(file)[0]
+        match = pattern.fullmatch(stem)
+        groups.setdefault((match.group(1) if match else stem).lower(), []).append(file)
+
+    keep = set()
+    for variants in groups.values():
+        if len(variants) == 1:
+            keep.add(variants[0])
+            continue
+        sizes = {f: package_size(root, path.splitext(f)[0]) for f in variants}
+        chosen = (min if prefer == "smallest" else max)(variants, key=lambda f: sizes[f])
+        keep.add(chosen)
+        logger.debug(f"[变体选择] {root}: 保留 {chosen}，跳过 {', '.join(f for f in variants if f != chosen)}")
+    return [f for f in files if f in keep]
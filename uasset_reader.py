@@ -0,0 +1,230 @@
+"""
+UE4.27 cooked 资源包（.uasset）头部读取
+解析 FPackageFileSummary、名称表、导入表与导出表，供原生贴图导出等按资源类型处理的流程使用；
+导出对象的数据位于同名 .uexp 中，偏移为 SerialOffset - TotalHeaderSize
+"""
+import struct
+from dataclasses import dataclass, field
+
+PACKAGE_TAG = 0x9E2A83C1
+PKG_UNVERSIONED_PROPERTIES = 0x2000
+PKG_FILTER_EDITOR_ONLY = 0x80000000
+
+# 用到的 FileVersionUE4 分界
+VER_UE4_ENGINE_VERSION_OBJECT = 336
+VER_UE4_PACKAGE_SUMMARY_HAS_COMPATIBLE_ENGINE_VERSION = 444
+VER_UE4_LOAD_FOR_EDITOR_GAME = 365
+VER_UE4_ADD_STRING_ASSET_REFERENCES_MAP = 384
+VER_UE4_SERIALIZE_TEXT_IN_PACKAGES = 459
+VER_UE4_COOKED_ASSETS_IN_EDITOR_SUPPORT = 485
+VER_UE4_NAME_HASHES_SERIALIZED = 504
+VER_UE4_PRELOAD_DEPENDENCIES_IN_COOKED_EXPORTS = 507
+VER_UE4_TEMPLATE_INDEX_IN_COOKED_EXPORTS = 508
+VER_UE4_ADDED_SEARCHABLE_NAMES = 510
+VER_UE4_64BIT_EXPORTMAP_SERIALSIZES = 511
+VER_UE4_ADDED_PACKAGE_SUMMARY_LOCALIZATION_ID = 516
+VER_UE4_ADDED_PACKAGE_OWNER = 518
+VER_UE4_NON_OUTER_PACKAGE_IMPORT = 520
+
+
+class UAssetError(Exception):
+    """资源包结构异常或不支持的版本"""
+
+
+class Reader:
+    """小端二进制游标，附带 FString / FName 读取"""
+
+    def __init__(self, data, pos: int = 0, names: list = None):
+        self.data = data
+        self.pos = pos
+        self.names = names or []
+
+    def unpack(self, fmt: str):
+        values = struct.unpack_from(fmt, self.data, self.pos)
+        self.pos += struct.calcsize(fmt)
+        return values if len(values) > 1 else values[0]
+
+    def read(self, size: int) -> bytes:
+        if size < 0 or self.pos + size > len(self.data):
+            raise UAssetError(f"读取越界: {self.pos} + {size} > {len(self.data)}")
+        chunk = bytes(self.data[self.pos:self.pos + size])
+        self.pos += size
+        return chunk
+
+    def fstring(self) -> str:
+        """UE FString：int32 长度，负数表示 UTF-16"""
+        size = self.unpack("<i")
+        if size == 0:
+            return ""
+        if size < 0:
+            return self.read(-size * 2).decode("utf-16-le").rstrip("\0")
+        return self.read(size).decode("utf-8", errors="replace").rstrip("\0")
+
+    def fname(self) -> str:
+        """FName：名称表序号 + 编号（编号非 0 时为 name_{编号-1}）"""
+        index, number = self.unpack("<ii")
+        if not 0 <= index < len(self.names):
+            raise UAssetError(f"名称序号越界: {index}")
+        name = self.names[index]
+        return f"{name}_{number - 1}" if number else name
+
+
+@dataclass(slots=True)
+class ObjectImport:
+    class_package: str
+    class_name: str
+    outer_index: int
+    object_name: str
+
+
+@dataclass(slots=True)
+class ObjectExport:
+    class_index: int
+    super_index: int
+    template_index: int
+    outer_index: int
+    object_name: str
+    object_flags: int
+    serial_size: int
+    serial_offset: int
+
+
+@dataclass
+class Package:
+    """资源包头部信息"""
+    file_version: int
+    licensee_version: int
+    total_header_size: int
+    package_flags: int
+    bulk_data_start_offset: int
+    names: list = field(default_factory=list)
+    imports: list = field(default_factory=list)
+    exports: list = field(default_factory=list)
+
+    @property
+    def unversioned(self) -> bool:
+        """属性以无版本（unversioned）格式序列化，没有类结构信息时无法逐个跳过"""
+        return bool(self.package_flags & PKG_UNVERSIONED_PROPERTIES)
+
+    def class_name(self, export: ObjectExport) -> str:
+        """导出对象的类名（如 Texture2D）"""
+        index = export.class_index
+        if index < 0 and -index - 1 < len(self.imports):
+            return self.imports[-index - 1].object_name
+        if index > 0 and index - 1 < len(self.exports):
+            return self.exports[index - 1].object_name
+        return ""
+
+    def reader(self, data, pos: int = 0) -> Reader:
+        """在 data 上创建共享本包名称表的游标"""
+        return Reader(data, pos, self.names)
+
+
+def _skip_engine_version(r: Reader):
+    r.pos += 2 + 2 + 2 + 4  # major minor patch changelist
+    r.fstring()             # branch
+
+
+def _read_summary(data):
+    """读取 FPackageFileSummary 与名称表（支持 UE4.14 ~ 4.27 的 LegacyFileVersion -6 / -7）"""
+    r = Reader(data)
+    tag, legacy = r.unpack("<Ii")
+    if tag != PACKAGE_TAG:
+        raise UAssetError(f"不是 UE 资源包: tag={tag:#x}")
+    if legacy not in (-6, -7):
+        raise UAssetError(f"不支持的 LegacyFileVersion: {legacy}")
+    r.pos += 4  # LegacyUE3Version
+    file_version, licensee_version = r.unpack("<ii")
+    if file_version == 0:
+        raise UAssetError("无版本号的资源包（unversioned package）")
+    custom_count = r.unpack("<i")
+    r.pos += custom_count * 20  # FGuid + int32
+    total_header_size = r.unpack("<i")
+    r.fstring()  # FolderName
+    package_flags, name_count, name_offset = r.unpack("<Iii")
+    editor_only = bool(package_flags & PKG_FILTER_EDITOR_ONLY)
+    if not editor_only and file_version >= VER_UE4_ADDED_PACKAGE_SUMMARY_LOCALIZATION_ID:
+        r.fstring()  # LocalizationId
+    if file_version >= VER_UE4_SERIALIZE_TEXT_IN_PACKAGES:
+        r.pos += 8  # GatherableTextData count / offset
+    export_count, export_offset, import_count, import_offset = r.unpack("<iiii")
+    r.pos += 4  # DependsOffset
+    if file_version >= VER_UE4_ADD_STRING_ASSET_REFERENCES_MAP:
+        r.pos += 8  # SoftPackageReferences count / offset
+    if file_version >= VER_UE4_ADDED_SEARCHABLE_NAMES:
+        r.pos += 4
+    r.pos += 4 + 16  # ThumbnailTableOffset + Guid
+    if not editor_only and file_version >= VER_UE4_ADDED_PACKAGE_OWNER:
+        r.pos += 16  # PersistentGuid
+        if file_version < VER_UE4_NON_OUTER_PACKAGE_IMPORT:
+            r.pos += 16  # OwnerPersistentGuid
+    generation_count = r.unpack("<i")
+    r.pos += generation_count * 8
+    if file_version >= VER_UE4_ENGINE_VERSION_OBJECT:
+        _skip_engine_version(r)
+    if file_version >= VER_UE4_PACKAGE_SUMMARY_HAS_COMPATIBLE_ENGINE_VERSION:
+        _skip_engine_version(r)
+    compression_flags, compressed_chunks = r.unpack("<Ii")
+    if compressed_chunks:
+        raise UAssetError("不支持整包压缩的资源包")
+    r.pos += 4  # PackageSource
+    for _ in range(r.unpack("<i")):
+        r.fstring()  # AdditionalPackagesToCook
+    if legacy > -7:
+        r.pos += 4  # NumTextureAllocations
+    r.pos += 4  # AssetRegistryDataOffset
+    bulk_data_start_offset = r.unpack("<q")
+
+    pkg = Package(file_version=file_version, licensee_version=licensee_version,
+                  total_header_size=total_header_size, package_flags=package_flags,
+                  bulk_data_start_offset=bulk_data_start_offset)
+
+    r.pos = name_offset
+    for _ in range(name_count):
+        pkg.names.append(r.fstring())
+        if file_version >= VER_UE4_NAME_HASHES_SERIALIZED:
+            r.pos += 4  # 两个 uint16 哈希
+    r.names = pkg.names
+    return pkg, r, (import_count, import_offset, export_count, export_offset)
+
+
+def read_package(data) -> Package:
+    """读取 .uasset 的摘要、名称表、导入表与导出表"""
+    try:
+        pkg, r, (import_count, import_offset, export_count, export_offset) = _read_summary(data)
+        editor_only = bool(pkg.package_flags & PKG_FILTER_EDITOR_ONLY)
+
+        r.pos = import_offset
+        for _ in range(import_count):
+            class_package, class_name = r.fname(), r.fname()
+            outer_index = r.unpack("<i")
+            object_name = r.fname()
+            if pkg.file_version >= VER_UE4_NON_OUTER_PACKAGE_IMPORT and not editor_only:
+                r.fname()  # PackageName
+            pkg.imports.append(ObjectImport(class_package, class_name, outer_index, object_name))
+
+        r.pos = export_offset
+        for _ in range(export_count):
+            class_index, super_index = r.unpack("<ii")
+            template_index = 0
+            if pkg.file_version >= VER_UE4_TEMPLATE_INDEX_IN_COOKED_EXPORTS:
+                template_index = r.unpack("<i")
+            outer_index = r.unpack("<i")
+            object_name = r.fname()
+            object_flags = r.unpack("<I")
+            if pkg.file_version >= VER_UE4_64BIT_EXPORTMAP_SERIALSIZES:
+                serial_size, serial_offset = r.unpack("<qq")
+            else:
+                serial_size, serial_offset = r.unpack("<ii")
+            r.pos += 12 + 16 + 4  # bForcedExport bNotForClient bNotForServer PackageGuid PackageFlags
+            if pkg.file_version >= VER_UE4_LOAD_FOR_EDITOR_GAME:
+                r.pos += 4  # bNotAlwaysLoadedForEditorGame
+            if pkg.file_version >= VER_UE4_COOKED_ASSETS_IN_EDITOR_SUPPORT:
+                r.pos += 4  # bIsAsset
+            if pkg.file_version >= VER_UE4_PRELOAD_DEPENDENCIES_IN_COOKED_EXPORTS:
+                r.pos += 20  # FirstExportDependency + 4 个依赖计数
+            pkg.exports.append(ObjectExport(class_index, super_index, template_index, outer_index,
+                                            object_name, object_flags, serial_size, serial_offset))
+    except struct.error as e:
+        raise UAssetError(f"资源包头部不完整: {e}") from e
+    return pkg